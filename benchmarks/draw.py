@@ -0,0 +1,71 @@
+"""
+Winner draw benchmarks: streaming reservoir sample vs materializing the pool,
+and weighted multi-winner draws from the alias table.
+
+    python -m benchmarks.draw [entrants]
+"""
+
+import array
+import asyncio
+import random
+import sys
+import time
+import tracemalloc
+
+from src.utils.draw import reservoir_sample, weighted_sample
+
+
+class Entrant:
+    __slots__ = ("id", "bot")
+
+    def __init__(self, id: int, bot: bool) -> None:
+        self.id = id
+        self.bot = bot
+
+
+async def entrants(n: int):
+    # every 1000th entrant is a bot, like the bot's own reaction
+    for i in range(n):
+        yield Entrant(i, i % 1000 == 0)
+
+
+async def materialized(n: int, k: int):
+    pool = [entrant async for entrant in entrants(n)]
+    pool = [entrant for entrant in pool if not entrant.bot]
+    return random.sample(pool, k)
+
+
+async def streaming(n: int, k: int):
+    return await reservoir_sample(entrants(n), k, skip=lambda e: e.bot)
+
+
+async def weighted(n: int, k: int):
+    # a fifth of the entrants hold a role worth 2 or 3 entries
+    rng = random.Random(0)
+    weights = array.array("d", (rng.choice((1, 1, 1, 1, 2, 3)) for _ in range(n)))
+    return weighted_sample(weights, k)
+
+
+async def measure(name: str, func, n: int, k: int) -> None:
+    tracemalloc.start()
+    started = time.perf_counter()
+    winners = await func(n, k)
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(
+        f"{name:<13} k={k:<3} {elapsed:7.3f}s  peak {peak / 1024 / 1024:8.2f} MiB  ({len(winners)} winners)"
+    )
+
+
+async def main(n: int) -> None:
+    print(f"{n} synthetic entrants, {n // 2} for weighted draws")
+    for k in (1, 50):
+        await measure("materialized", materialized, n, k)
+        await measure("streaming", streaming, n, k)
+    for k in (1, 10, 50):
+        await measure("weighted", weighted, n // 2, k)
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000))
@@ -0,0 +1,61 @@
+"""
+Entrant set benchmarks: memory and speed of EntrantSet against a plain set
+of user ids, filled one entry at a time like reactions arrive.
+
+    python -m benchmarks.entrants [entrants]
+"""
+
+import array
+import random
+import sys
+import time
+
+from src.utils.entrants import EntrantSet
+
+
+def snowflakes(n: int) -> array.array:
+    # ids of accounts created over a few years, in random order. Kept in an
+    # array so every add gets a fresh int, like ids parsed from events
+    rng = random.Random(0)
+    return array.array("Q", (rng.randrange(1 << 56, 1 << 60) for _ in range(n)))
+
+
+def set_nbytes(entrants: set) -> int:
+    return sys.getsizeof(entrants) + sum(sys.getsizeof(user_id) for user_id in entrants)
+
+
+def measure(name: str, factory, nbytes, user_ids) -> None:
+    started = time.perf_counter()
+    entrants = factory()
+    for user_id in user_ids:
+        entrants.add(user_id)
+    filled = time.perf_counter() - started
+    size = nbytes(entrants)
+
+    probes = list(user_ids[::10]) + [user_id + 1 for user_id in user_ids[::10]]
+    started = time.perf_counter()
+    for user_id in probes:
+        user_id in entrants
+    lookups = (time.perf_counter() - started) / len(probes)
+
+    started = time.perf_counter()
+    snapshot = (
+        entrants.snapshot() if isinstance(entrants, EntrantSet) else list(entrants)
+    )
+    snapshotted = time.perf_counter() - started
+    print(
+        f"{name:<11} {size / 1024 / 1024:8.2f} MiB  {size / len(user_ids):6.1f} B/entrant  "
+        f"fill {filled:6.2f}s  lookup {lookups * 1e6:5.2f}us  snapshot {snapshotted * 1e3:7.2f}ms "
+        f"({len(snapshot)} entrants)"
+    )
+
+
+def main(n: int) -> None:
+    user_ids = snowflakes(n)
+    print(f"{n} entrants")
+    measure("set", set, set_nbytes, user_ids)
+    measure("EntrantSet", EntrantSet, EntrantSet.nbytes, user_ids)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
@@ -1,3 +1,8 @@
+import time
+
+# taken first so the boot report covers imports too
+started = time.perf_counter()
+
 import logging
 
 logging.basicConfig(level=logging.DEBUG)
@@ -13,6 +18,7 @@ try:
 except (ImportError, ModuleNotFoundError):
     log.fatal("uvloop not installed, falling back to asyncio")
 
+import asyncio
 import subprocess
 from asyncio import run
 from datetime import datetime
@@ -20,88 +26,156 @@ from datetime import datetime
 import discord
 from discord.ext import commands
 from dotenv import load_dotenv
-from watchdog.events import FileSystemEventHandler
-from watchdog.observers import Observer
 
 load_dotenv()
 import os
 
 from sql.easy_sql import EasySQL
-
-bot = commands.Bot(command_prefix="g!", intents=discord.Intents.all())
+from sql.migrate import migrate
+from sql.statements import GIVEAWAYS
+from src.utils import tree_sync
+from src.utils.boot import BootTimer
+from src.utils.gateway import client_options, memory_report
+from src.utils.ipc import IPCClient
+from src.utils.resolver import Resolver
+
+# SHARD_COUNT alone runs every shard in this process, SHARD_IDS (comma
+# separated) splits them across processes, unset lets Discord decide
+shard_count = os.environ.get("SHARD_COUNT")
+shard_ids = os.environ.get("SHARD_IDS")
+bot = commands.AutoShardedBot(
+    command_prefix="g!",
+    **client_options(),
+    shard_count=int(shard_count) if shard_count else None,
+    shard_ids=[int(shard_id) for shard_id in shard_ids.split(",")]
+    if shard_ids
+    else None,
+)
 bot.db = None
+bot.resolver = Resolver(bot)
+# set when running as a worker of cluster.py
+bot.ipc = IPCClient(os.environ.get("CLUSTER_IPC"), int(os.environ.get("CLUSTER_ID", 0)))
 bot.start_time = datetime.utcnow()
+bot.version_ = "unknown"
 bot.remove_command("help")
-observer = Observer()
-
-
-class FileHandler(FileSystemEventHandler):
-    def on_modified(self, event):
-        log.info(f"File changed: {event.src_path}")
-        if event.src_path.endswith(".py"):
-            log.info("Reloading...")
-            path = event.src_path.replace("\\", "/").replace("/", ".")[:-3]
-            try:
-                run(bot.reload_extension(path))
-                log.info(f"Reloaded {path}")
-            except Exception as e:
-                log.error(f"Failed to reload {path}")
-                log.error(e)
-
-
-observer.schedule(FileHandler(), path="src", recursive=False)
+boot = BootTimer(started)
+boot.phases["imports"] = time.perf_counter() - started
+observer = None
+
+
+def start_file_watcher(loop: asyncio.AbstractEventLoop) -> None:
+    """Reload cogs when their file changes, runs in a worker thread."""
+    # watchdog is slow to import, this keeps it off the startup path
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+
+    global observer
+
+    class FileHandler(FileSystemEventHandler):
+        def on_modified(self, event):
+            log.info(f"File changed: {event.src_path}")
+            if event.src_path.endswith(".py"):
+                log.info("Reloading...")
+                path = event.src_path.replace("\\", "/").replace("/", ".")[:-3]
+                try:
+                    asyncio.run_coroutine_threadsafe(
+                        bot.reload_extension(path), loop
+                    ).result()
+                    log.info(f"Reloaded {path}")
+                except Exception as e:
+                    log.error(f"Failed to reload {path}")
+                    log.error(e)
+
+    observer = Observer()
+    observer.schedule(FileHandler(), path="src", recursive=False)
+    observer.start()
 
 
 @bot.event
 async def on_ready():
-    log.info("Logged in as %s", bot.user.name)
-    await bot.tree.sync()
-
-
-def get_git_revision_short_hash() -> str:
-    return (
-        subprocess.check_output(["git", "rev-parse", "--short", "HEAD"])
-        .decode("ascii")
-        .strip()
+    log.info(
+        "Logged in as %s running shards %s of %s",
+        bot.user.name,
+        sorted(bot.shards),
+        bot.shard_count,
     )
-
-
-def get_version():
-    is_updated = (
-        subprocess.run(["git", "status", "-uno"], stdout=subprocess.PIPE)
-        .stdout.decode("ascii")
-        .strip()
+    log.info(f"Memory after startup: {memory_report(bot)}")
+    if not boot.reported:
+        boot.stop("gateway")
+        log.info(f"Boot timing: {boot.report()}")
+        # on_ready fires again after reconnects, and in a cluster one worker
+        # is enough. Unchanged scopes are skipped, see src/utils/tree_sync.py
+        if bot.ipc.cluster_id == 0:
+            for guild in tree_sync.scopes(bot):
+                try:
+                    await tree_sync.sync(bot, bot.db, guild)
+                except discord.HTTPException:
+                    log.exception("Failed to sync application commands")
+
+
+async def git(*args: str) -> str:
+    process = await asyncio.create_subprocess_exec(
+        "git", *args, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL
     )
+    stdout, _ = await process.communicate()
+    return stdout.decode("ascii").strip()
+
+
+async def get_version():
+    with boot.phase("version"):
+        try:
+            is_updated, revision = await asyncio.gather(
+                git("status", "-uno"), git("rev-parse", "--short", "HEAD")
+            )
+        except OSError:
+            log.warning("Couldn't run git, version unknown")
+            return
     if "up to date" in is_updated:
-        is_updated = True
+        bot.version_ = f"latest ({revision})"
     else:
-        is_updated = False
+        bot.version_ = f"old ({revision}) - not up to date"
 
-    if is_updated:
-        bot.version_ = f"latest ({get_git_revision_short_hash()})"
-    else:
-        bot.version_ = f"old ({get_git_revision_short_hash()}) - not up to date"
 
+async def load_extension(name: str) -> None:
+    with boot.phase(name):
+        await bot.load_extension(name)
 
-async def main():
-    async with bot:
-        bot.db = await EasySQL().connect(
+
+async def connect_database():
+    with boot.phase("database"):
+        bot.db = await EasySQL(GIVEAWAYS).connect(
             host=os.environ.get("DB_HOST"),
             database="giveaways",
             user="giveaway_bot",
             password=os.environ["DB_PASS"],
         )
-        log.info("Connected to database")
-        for cog in os.listdir("src"):
-            if cog.endswith(".py"):
-                await bot.load_extension(f"src.{cog[:-3]}")
-        await bot.load_extension("jishaku")
+    log.info("Connected to database")
+    with boot.phase("migrations"):
+        applied = await migrate(bot.db)
+    log.info(f"Applied {applied} migrations")
+
+
+async def main():
+    async with bot:
+        loop = asyncio.get_running_loop()
+        version = asyncio.create_task(get_version())
+        watcher = loop.run_in_executor(None, start_file_watcher, loop)
+        await asyncio.gather(connect_database(), bot.ipc.connect())
+        # the cogs don't depend on each other, only on the database
+        with boot.phase("extensions"):
+            await asyncio.gather(
+                *(
+                    load_extension(f"src.{cog[:-3]}")
+                    for cog in sorted(os.listdir("src"))
+                    if cog.endswith(".py")
+                ),
+                load_extension("jishaku"),
+            )
         log.info("Loaded all extensions")
-        await bot.db.execute(open("sql/postgres_starter.sql", "r").read())
-        log.info("Loaded starter SQL")
-        observer.start()
+        await watcher
         log.info("Started file watcher")
-        get_version()
+        await version
+        boot.start("gateway")
         await bot.start(os.environ["DISCORD_TOKEN"])
 
 
@@ -111,4 +185,5 @@ if __name__ == "__main__":
     except KeyboardInterrupt:
         log.info("Exiting...")
         run(bot.db.close())
-        observer.stop()
+        if observer is not None:
+            observer.stop()
@@ -0,0 +1,191 @@
+"""
+Runs the bot as several worker processes, each one a bot.py with its own
+event loop and database pool running a contiguous range of shards.
+
+    python cluster.py
+
+CLUSTERS (default: one per CPU core) and SHARD_COUNT (default: CLUSTERS)
+come from the environment. Crashed workers are restarted with a growing
+delay. Workers talk to each other through this process over a unix socket,
+see src/utils/ipc.py.
+"""
+
+import asyncio
+import itertools
+import json
+import logging
+import os
+import signal
+import sys
+import tempfile
+import time
+import typing
+
+from dotenv import load_dotenv
+
+from src.utils.ipc import encode
+
+logging.basicConfig(level=logging.INFO)
+log = logging.getLogger("GiveawayBot.Cluster")
+
+# a broadcast gives up on workers that didn't answer in time
+BROADCAST_TIMEOUT = 8
+# a worker that ran this long before crashing is restarted right away
+STABLE_AFTER = 60
+
+
+def shard_ranges(shard_count: int, clusters: int) -> typing.List[typing.List[int]]:
+    """Split the shards into ``clusters`` contiguous ranges of near equal size."""
+    size, extra = divmod(shard_count, clusters)
+    ranges, start = [], 0
+    for cluster in range(clusters):
+        end = start + size + (cluster < extra)
+        ranges.append(list(range(start, end)))
+        start = end
+    return [shards for shards in ranges if shards]
+
+
+class _Broadcast:
+    def __init__(self, waiting: typing.Set[int]) -> None:
+        self.waiting = waiting
+        self.replies: typing.List[typing.Dict] = []
+        self.done = asyncio.Event()
+
+
+class Hub:
+    """Relays broadcasts between the workers."""
+
+    def __init__(self) -> None:
+        self.workers: typing.Dict[int, asyncio.StreamWriter] = {}
+        self._broadcasts: typing.Dict[int, _Broadcast] = {}
+        self._ids = itertools.count()
+        # the loop only keeps weak references to tasks
+        self._tasks: typing.Set[asyncio.Task] = set()
+
+    async def handle(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        cluster = None
+        try:
+            async for line in reader:
+                message = json.loads(line)
+                if message["op"] == "hello":
+                    cluster = message["cluster"]
+                    self.workers[cluster] = writer
+                elif message["op"] == "broadcast":
+                    task = asyncio.create_task(self.broadcast(writer, message))
+                    self._tasks.add(task)
+                    task.add_done_callback(self._tasks.discard)
+                elif message["op"] == "reply":
+                    broadcast = self._broadcasts.get(message.pop("id"))
+                    if broadcast is None:
+                        continue
+                    message.pop("op")
+                    broadcast.replies.append(message)
+                    broadcast.waiting.discard(message["cluster"])
+                    if not broadcast.waiting:
+                        broadcast.done.set()
+        finally:
+            if cluster is not None and self.workers.get(cluster) is writer:
+                del self.workers[cluster]
+            writer.close()
+
+    async def broadcast(
+        self, requester: asyncio.StreamWriter, message: typing.Mapping
+    ) -> None:
+        id = next(self._ids)
+        broadcast = self._broadcasts[id] = _Broadcast(set(self.workers))
+        call = encode(
+            {
+                "op": "call",
+                "id": id,
+                "command": message["command"],
+                "args": message["args"],
+            }
+        )
+        for writer in list(self.workers.values()):
+            writer.write(call)
+        try:
+            await asyncio.wait_for(broadcast.done.wait(), BROADCAST_TIMEOUT)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            del self._broadcasts[id]
+        replies = broadcast.replies + [
+            {"cluster": cluster, "error": "No reply"} for cluster in broadcast.waiting
+        ]
+        replies.sort(key=lambda reply: reply["cluster"])
+        requester.write(
+            encode({"op": "results", "id": message["id"], "results": replies})
+        )
+
+
+class Supervisor:
+    def __init__(self, clusters: int, shard_count: int) -> None:
+        self.ranges = shard_ranges(shard_count, clusters)
+        self.shard_count = shard_count
+        self.hub = Hub()
+        self.path = os.path.join(tempfile.mkdtemp(prefix="giveaway-bot-"), "ipc.sock")
+        self.processes: typing.Dict[int, asyncio.subprocess.Process] = {}
+        self.stopping = False
+
+    async def run_worker(self, cluster: int, shards: typing.List[int]) -> None:
+        env = dict(
+            os.environ,
+            SHARD_COUNT=str(self.shard_count),
+            SHARD_IDS=",".join(map(str, shards)),
+            CLUSTER_ID=str(cluster),
+            CLUSTER_IPC=self.path,
+        )
+        delay = 1
+        while not self.stopping:
+            started = time.monotonic()
+            process = await asyncio.create_subprocess_exec(
+                sys.executable, "bot.py", env=env
+            )
+            self.processes[cluster] = process
+            log.info(
+                f"Started cluster {cluster} (pid {process.pid}) with shards {shards[0]}-{shards[-1]}"
+            )
+            code = await process.wait()
+            del self.processes[cluster]
+            if self.stopping:
+                return
+            if code == 0:
+                log.info(f"Cluster {cluster} exited")
+                return
+            if time.monotonic() - started > STABLE_AFTER:
+                delay = 1
+            log.error(
+                f"Cluster {cluster} exited with {code}, restarting in {delay} seconds"
+            )
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, STABLE_AFTER)
+
+    def stop(self) -> None:
+        self.stopping = True
+        for process in self.processes.values():
+            process.terminate()
+
+    async def run(self) -> None:
+        server = await asyncio.start_unix_server(self.hub.handle, path=self.path)
+        loop = asyncio.get_running_loop()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(signum, self.stop)
+        log.info(f"Running {self.shard_count} shards in {len(self.ranges)} clusters")
+        async with server:
+            await asyncio.gather(
+                *(
+                    self.run_worker(cluster, shards)
+                    for cluster, shards in enumerate(self.ranges)
+                )
+            )
+        os.unlink(self.path)
+        os.rmdir(os.path.dirname(self.path))
+
+
+if __name__ == "__main__":
+    load_dotenv()
+    clusters = int(os.environ.get("CLUSTERS", os.cpu_count() or 1))
+    shard_count = int(os.environ.get("SHARD_COUNT", clusters))
+    asyncio.run(Supervisor(clusters, shard_count).run())
@@ -0,0 +1,130 @@
+import datetime
+import logging
+import re
+import typing
+
+import asyncpg
+
+log = logging.getLogger("GiveawayBot.Archive")
+
+# arbitrary key so only one process archives at a time
+LOCK_KEY = 0x61726368
+
+_partition = re.compile(r"giveaways_archive_(?P<year>[0-9]{4})_(?P<month>[0-9]{2})")
+
+MOVE = """
+    WITH moved AS (
+        DELETE FROM giveaways WHERE id IN (
+            SELECT id FROM giveaways
+            WHERE announced AND ended_at < $1
+            LIMIT $2
+            FOR UPDATE SKIP LOCKED
+        )
+        RETURNING *
+    )
+    INSERT INTO giveaways_archive SELECT * FROM moved RETURNING id
+"""
+
+
+def month_start(timestamp: float) -> datetime.datetime:
+    moment = datetime.datetime.fromtimestamp(timestamp, datetime.timezone.utc)
+    return moment.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def next_month(month: datetime.datetime) -> datetime.datetime:
+    if month.month == 12:
+        return month.replace(year=month.year + 1, month=1)
+    return month.replace(month=month.month + 1)
+
+
+async def ensure_partitions(conn: asyncpg.Connection, start: float, end: float) -> None:
+    """Create the monthly partitions covering ``start`` up to ``end``."""
+    month = month_start(start)
+    while month.timestamp() < end:
+        following = next_month(month)
+        await conn.execute(
+            f"CREATE TABLE IF NOT EXISTS giveaways_archive_{month:%Y_%m} "
+            "PARTITION OF giveaways_archive "
+            f"FOR VALUES FROM ({month.timestamp()}) TO ({following.timestamp()})"
+        )
+        month = following
+
+
+async def partitions(conn: asyncpg.Connection) -> typing.List[typing.Tuple[str, float]]:
+    """Every archive partition with the end of the month it holds."""
+    names = await conn.fetch(
+        "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+        "WHERE i.inhparent = 'giveaways_archive'::regclass"
+    )
+    result = []
+    for (name,) in names:
+        match = _partition.fullmatch(name)
+        if match is None:
+            continue
+        month = datetime.datetime(
+            int(match["year"]), int(match["month"]), 1, tzinfo=datetime.timezone.utc
+        )
+        result.append((name, next_month(month).timestamp()))
+    return result
+
+
+async def archive(
+    pool,
+    *,
+    archive_after: float,
+    retention: typing.Optional[float] = None,
+    batch: int = 1000,
+) -> typing.Tuple[int, int]:
+    """Move drawn giveaways older than ``archive_after`` seconds to the archive.
+
+    Their entry ledgers are dropped, the winners stay. With ``retention``
+    whole archive months older than that are dropped, which is a cheap
+    ``DROP TABLE`` instead of a delete. Returns the number of giveaways
+    archived and of partitions dropped. Skips the run if another process
+    holds the archive lock.
+    """
+    now = datetime.datetime.now().timestamp()
+    cutoff = now - archive_after
+    archived = dropped = 0
+    async with pool.acquire() as conn:
+        if not await conn.fetchval("SELECT pg_try_advisory_lock($1)", LOCK_KEY):
+            return 0, 0
+        try:
+            oldest = await conn.fetchval(
+                "SELECT min(ended_at) FROM giveaways "
+                "WHERE announced AND ended_at < $1",
+                cutoff,
+            )
+            if oldest is not None:
+                await ensure_partitions(conn, oldest, cutoff)
+                while True:
+                    # short transactions so entry inserts are never held up for long
+                    async with conn.transaction():
+                        ids = [
+                            row["id"] for row in await conn.fetch(MOVE, cutoff, batch)
+                        ]
+                        if ids:
+                            await conn.execute(
+                                "DELETE FROM giveaway_entries WHERE giveaway_id = ANY($1::bigint[])",
+                                ids,
+                            )
+                    archived += len(ids)
+                    if len(ids) < batch:
+                        break
+            if retention is not None:
+                for name, ends in await partitions(conn):
+                    if ends > now - retention:
+                        continue
+                    async with conn.transaction():
+                        await conn.execute(
+                            f"DELETE FROM giveaway_winners w USING {name} a "
+                            "WHERE w.giveaway_id = a.id"
+                        )
+                        await conn.execute(f"DROP TABLE {name}")
+                    dropped += 1
+                    log.info(f"Dropped archive partition {name}")
+        finally:
+            await conn.execute("SELECT pg_advisory_unlock($1)", LOCK_KEY)
+    if archived:
+        log.info(f"Archived {archived} giveaways")
+    return archived, dropped
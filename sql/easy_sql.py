@@ -1,40 +1,178 @@
+import asyncio
+import json
+import logging
+import secrets
 import typing
 
 import asyncpg
 
+log = logging.getLogger("GiveawayBot.Events")
+
+Subscriber = typing.Callable[[typing.Dict[str, typing.Any]], typing.Awaitable[None]]
+
 
 class EasySQL:
-    def __init__(self) -> None:
-        self.db = None
-        self.cursor = None
-
-    async def connect(
-        self, host, database, user, password
-    ) -> typing.Optional[asyncpg.connection.Connection]:
-        self.db = await asyncpg.create_pool(
+    """
+    Thin query layer over an asyncpg pool.
+
+    Every method takes either raw SQL with ``$n`` parameters or the name of a
+    statement registered in ``statements``. Statements run through asyncpg's
+    per-connection statement cache, so a named statement is parsed and
+    planned once per pool connection and reused from then on.
+
+    It also carries events between processes sharing the database: ``publish``
+    sends a NOTIFY on the event's channel through the pool and ``subscribe``
+    receives them on one dedicated LISTEN connection, opened on first use and
+    reopened if it drops. A process doesn't receive its own events.
+    """
+
+    def __init__(
+        self, statements: typing.Optional[typing.Mapping[str, str]] = None
+    ) -> None:
+        self.db: typing.Optional[asyncpg.Pool] = None
+        self.statements: typing.Dict[str, str] = dict(statements or {})
+        # tells our own notifications apart from other processes'
+        self.sender = secrets.token_hex(8)
+        self._connect_args: typing.Dict[str, typing.Any] = {}
+        self._listener: typing.Optional[asyncpg.Connection] = None
+        self._listener_lock = asyncio.Lock()
+        self._subscribers: typing.Dict[str, typing.List[Subscriber]] = {}
+        self._closing = False
+        # the loop only keeps weak references to tasks
+        self._tasks: typing.Set[asyncio.Task] = set()
+
+    async def connect(self, host, database, user, password, **kwargs) -> "EasySQL":
+        # registered statements must never be evicted by ad-hoc queries
+        kwargs.setdefault("statement_cache_size", 100 + 2 * len(self.statements))
+        self._connect_args = dict(
             host=host, database=database, user=user, password=password
         )
-        return self.db
+        self.db = await asyncpg.create_pool(**self._connect_args, **kwargs)
+        return self
 
-    async def execute(self, query, *args) -> typing.Optional[dict]:
-        async with self.db.acquire() as conn:
-            await conn.execute(query, *args)
-            return dict(conn)
+    def register(self, name: str, query: str) -> None:
+        """Register a named statement."""
+        self.statements[name] = query
+
+    def _query(self, query: str) -> str:
+        return self.statements.get(query, query)
+
+    def acquire(self):
+        return self.db.acquire()
+
+    async def execute(self, query: str, *args) -> str:
+        return await self.db.execute(self._query(query), *args)
+
+    async def executemany(
+        self, query: str, args: typing.Iterable[typing.Sequence]
+    ) -> None:
+        await self.db.executemany(self._query(query), args)
 
-    async def fetch(self, query, *args) -> typing.Optional[dict]:
+    async def fetch(self, query: str, *args) -> typing.List[asyncpg.Record]:
+        return await self.db.fetch(self._query(query), *args)
+
+    async def fetchrow(self, query: str, *args) -> typing.Optional[asyncpg.Record]:
+        return await self.db.fetchrow(self._query(query), *args)
+
+    async def fetchval(self, query: str, *args, column: int = 0) -> typing.Any:
+        return await self.db.fetchval(self._query(query), *args, column=column)
+
+    async def cursor(
+        self, query: str, *args, prefetch: typing.Optional[int] = None
+    ) -> typing.AsyncIterator[asyncpg.Record]:
+        """Stream rows through a server side cursor instead of loading them all."""
         async with self.db.acquire() as conn:
-            await conn.execute(query, *args)
-            return dict(conn)
+            async with conn.transaction():
+                async for row in conn.cursor(
+                    self._query(query), *args, prefetch=prefetch
+                ):
+                    yield row
 
-    async def close(self) -> None:
-        await self.cursor.close()
-        await self.db.close()
+    async def publish(self, event: str, **data) -> None:
+        """Notify the other processes, ``data`` has to fit in 8000 bytes of JSON."""
+        payload = json.dumps({"sender": self.sender, "data": data})
+        await self.db.execute("SELECT pg_notify($1, $2)", event, payload)
+
+    async def subscribe(self, event: str, callback: Subscriber) -> None:
+        """Call ``callback`` with the data of every ``event`` another process publishes."""
+        callbacks = self._subscribers.setdefault(event, [])
+        callbacks.append(callback)
+        if len(callbacks) > 1:
+            return
+        async with self._listener_lock:
+            if self._listener is None:
+                await self._listen()
+            else:
+                await self._listener.add_listener(event, self._dispatch)
+
+    async def unsubscribe(self, event: str, callback: Subscriber) -> None:
+        callbacks = self._subscribers.get(event)
+        if not callbacks or callback not in callbacks:
+            return
+        callbacks.remove(callback)
+        if callbacks:
+            return
+        del self._subscribers[event]
+        if self._listener is not None and not self._listener.is_closed():
+            await self._listener.remove_listener(event, self._dispatch)
 
-    async def commit(self) -> None:
-        await self.db.commit()
+    async def _listen(self) -> None:
+        self._listener = await asyncpg.connect(**self._connect_args)
+        self._listener.add_termination_listener(self._lost)
+        for event in self._subscribers:
+            await self._listener.add_listener(event, self._dispatch)
 
-    async def rollback(self) -> None:
-        await self.db.rollback()
+    def _lost(self, connection: asyncpg.Connection) -> None:
+        if self._closing or connection is not self._listener:
+            return
+        log.warning("Lost the event listener connection, reconnecting")
+        self._listener = None
+        self._spawn(self._reconnect())
+
+    async def _reconnect(self) -> None:
+        delay = 1.0
+        async with self._listener_lock:
+            while self._listener is None and not self._closing:
+                try:
+                    await self._listen()
+                except (OSError, asyncpg.PostgresError):
+                    log.exception(
+                        f"Event listener reconnect failed, retrying in {delay}s"
+                    )
+                    await asyncio.sleep(delay)
+                    delay = min(delay * 2, 60)
+            if self._listener is not None:
+                # whatever was published in between is lost
+                log.info("Event listener reconnected")
+
+    def _dispatch(
+        self, connection: asyncpg.Connection, pid: int, event: str, payload: str
+    ) -> None:
+        message = json.loads(payload)
+        if message["sender"] == self.sender:
+            return
+        for callback in self._subscribers.get(event, ()):
+            self._spawn(self._deliver(event, callback, message["data"]))
+
+    def _spawn(self, coro: typing.Coroutine) -> None:
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _deliver(
+        self, event: str, callback: Subscriber, data: typing.Dict[str, typing.Any]
+    ) -> None:
+        try:
+            await callback(data)
+        except Exception:
+            log.exception(f"Subscriber of {event} failed")
+
+    async def close(self) -> None:
+        self._closing = True
+        if self._listener is not None:
+            await self._listener.close()
+        if self.db is not None:
+            await self.db.close()
 
     async def __aenter__(self) -> "EasySQL":
         return self
@@ -0,0 +1,89 @@
+import logging
+import os
+import re
+import typing
+
+import asyncpg
+
+log = logging.getLogger("GiveawayBot.Migrations")
+
+MIGRATIONS = os.path.join(os.path.dirname(__file__), "migrations")
+# arbitrary key so only one process migrates at a time
+LOCK_KEY = 0x67697665
+
+_filename = re.compile(r"(?P<version>[0-9]+)_(?P<name>\w+)\.sql")
+
+
+class Migration(typing.NamedTuple):
+    version: int
+    name: str
+    path: str
+
+    def read(self) -> str:
+        with open(self.path, "r") as f:
+            return f.read()
+
+
+def discover(directory: str = MIGRATIONS) -> typing.List[Migration]:
+    """Every ``NNNN_name.sql`` file in ``directory``, ordered by version."""
+    migrations = []
+    for filename in os.listdir(directory):
+        match = _filename.fullmatch(filename)
+        if match is None:
+            continue
+        migrations.append(
+            Migration(
+                int(match.group("version")),
+                match.group("name"),
+                os.path.join(directory, filename),
+            )
+        )
+    migrations.sort()
+    versions = [migration.version for migration in migrations]
+    if len(versions) != len(set(versions)):
+        raise RuntimeError(f"Duplicate migration versions in {directory}")
+    return migrations
+
+
+async def current_version(conn: asyncpg.Connection) -> int:
+    exists = await conn.fetchval("SELECT to_regclass('schema_version') IS NOT NULL")
+    if not exists:
+        return 0
+    return await conn.fetchval("SELECT coalesce(max(version), 0) FROM schema_version")
+
+
+async def migrate(pool: asyncpg.Pool, directory: str = MIGRATIONS) -> int:
+    """Apply pending migrations, each in its own transaction.
+
+    Returns the number of migrations applied. When the schema is current
+    this is a single read and no DDL runs.
+    """
+    migrations = discover(directory)
+    async with pool.acquire() as conn:
+        version = await current_version(conn)
+        pending = [m for m in migrations if m.version > version]
+        if not pending:
+            log.info(f"Schema is up to date (version {version})")
+            return 0
+        await conn.execute("SELECT pg_advisory_lock($1)", LOCK_KEY)
+        try:
+            # another process may have migrated while we waited for the lock
+            version = await current_version(conn)
+            pending = [m for m in migrations if m.version > version]
+            for migration in pending:
+                async with conn.transaction():
+                    await conn.execute(
+                        "CREATE TABLE IF NOT EXISTS schema_version("
+                        "version INT PRIMARY KEY, name TEXT NOT NULL, "
+                        "applied_at TIMESTAMPTZ NOT NULL DEFAULT now())"
+                    )
+                    await conn.execute(migration.read())
+                    await conn.execute(
+                        "INSERT INTO schema_version(version, name) VALUES($1, $2)",
+                        migration.version,
+                        migration.name,
+                    )
+                log.info(f"Applied migration {migration.version} {migration.name}")
+        finally:
+            await conn.execute("SELECT pg_advisory_unlock($1)", LOCK_KEY)
+    return len(pending)
@@ -0,0 +1,39 @@
+CREATE TABLE IF NOT EXISTS giveaways(
+    id BIGSERIAL,
+    owner_id BIGINT NOT NULL,
+    guild_id BIGINT NOT NULL,
+    channel_id BIGINT NOT NULL,
+    message_id BIGINT NOT NULL,
+    title TEXT NOT NULL,
+    description TEXT NOT NULL,
+    started_at FLOAT NOT NULL,
+    duration BIGINT NOT NULL,
+    ended_at FLOAT NOT NULL,
+    winner_id BIGINT,
+    conditions TEXT,
+    prize TEXT NOT NULL,
+    winners INT NOT NULL DEFAULT 1,
+    role_weights TEXT,
+    PRIMARY KEY (id)
+);
+CREATE TABLE IF NOT EXISTS setup(
+    guild_id BIGSERIAL,
+    giveaway_role_id BIGINT,
+    PRIMARY KEY (guild_id)
+);
+CREATE TABLE IF NOT EXISTS giveaway_entries(
+    giveaway_id BIGINT NOT NULL,
+    user_id BIGINT NOT NULL,
+    entered_at FLOAT NOT NULL,
+    weight FLOAT NOT NULL DEFAULT 1,
+    PRIMARY KEY (giveaway_id, user_id)
+);
+CREATE TABLE IF NOT EXISTS giveaway_winners(
+    giveaway_id BIGINT NOT NULL,
+    user_id BIGINT NOT NULL,
+    position INT NOT NULL,
+    PRIMARY KEY (giveaway_id, user_id)
+);
+ALTER TABLE giveaways ADD COLUMN IF NOT EXISTS winners INT NOT NULL DEFAULT 1;
+ALTER TABLE giveaways ADD COLUMN IF NOT EXISTS role_weights TEXT;
+ALTER TABLE giveaway_entries ADD COLUMN IF NOT EXISTS weight FLOAT NOT NULL DEFAULT 1;
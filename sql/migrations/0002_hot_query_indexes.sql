@@ -0,0 +1,4 @@
+CREATE UNIQUE INDEX IF NOT EXISTS giveaways_message_id_key ON giveaways(message_id);
+CREATE INDEX IF NOT EXISTS giveaways_undrawn_ended_at_idx ON giveaways(ended_at)
+WHERE winner_id IS NULL;
+CREATE INDEX IF NOT EXISTS giveaways_guild_id_ended_at_idx ON giveaways(guild_id, ended_at);
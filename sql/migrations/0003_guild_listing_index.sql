@@ -0,0 +1,3 @@
+-- list_giveaway pages through a guild on (ended_at, id)
+CREATE INDEX IF NOT EXISTS giveaways_guild_id_ended_at_id_idx ON giveaways(guild_id, ended_at, id);
+DROP INDEX IF EXISTS giveaways_guild_id_ended_at_idx;
@@ -0,0 +1,4 @@
+-- drawn giveaways are moved here by sql/archive.py, one partition per month of ended_at
+CREATE TABLE IF NOT EXISTS giveaways_archive (LIKE giveaways) PARTITION BY RANGE (ended_at);
+CREATE INDEX IF NOT EXISTS giveaways_archive_id_idx ON giveaways_archive(id);
+CREATE INDEX IF NOT EXISTS giveaways_archive_guild_id_ended_at_id_idx ON giveaways_archive(guild_id, ended_at, id);
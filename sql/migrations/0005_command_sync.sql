@@ -0,0 +1,6 @@
+-- hash of the application commands last synced per scope, 0 is the global scope
+CREATE TABLE IF NOT EXISTS command_sync(
+    scope BIGINT PRIMARY KEY,
+    hash TEXT NOT NULL,
+    synced_at FLOAT NOT NULL
+);
@@ -0,0 +1,7 @@
+-- how far startup catch-up got through the expired giveaways of a shard set
+CREATE TABLE IF NOT EXISTS catch_up(
+    scope TEXT PRIMARY KEY,
+    ended_at FLOAT NOT NULL,
+    id BIGINT NOT NULL,
+    updated_at FLOAT NOT NULL
+);
@@ -0,0 +1,6 @@
+-- lease taken on a giveaway while it is being drawn, see Giveaways.claim
+ALTER TABLE giveaways ADD COLUMN IF NOT EXISTS claimed_by TEXT;
+ALTER TABLE giveaways ADD COLUMN IF NOT EXISTS claim_expires FLOAT;
+-- the archive is filled with SELECT * from giveaways, so it has to keep up
+ALTER TABLE giveaways_archive ADD COLUMN IF NOT EXISTS claimed_by TEXT;
+ALTER TABLE giveaways_archive ADD COLUMN IF NOT EXISTS claim_expires FLOAT;
@@ -0,0 +1,9 @@
+-- a draw is saved (winner_id and giveaway_winners) before its message edit,
+-- announced is set once the edit went through, so a failed announcement is
+-- retried with the same winners instead of a new draw
+ALTER TABLE giveaways ADD COLUMN IF NOT EXISTS announced BOOLEAN NOT NULL DEFAULT FALSE;
+UPDATE giveaways SET announced = TRUE WHERE winner_id IS NOT NULL;
+ALTER TABLE giveaways_archive ADD COLUMN IF NOT EXISTS announced BOOLEAN NOT NULL DEFAULT TRUE;
+CREATE INDEX IF NOT EXISTS giveaways_unannounced_ended_at_id_idx ON giveaways(ended_at, id)
+WHERE NOT announced;
+DROP INDEX IF EXISTS giveaways_undrawn_ended_at_idx;
@@ -1,2 +1,8 @@
 DROP TABLE IF EXISTS giveaways;
-DROP TABLE IF EXISTS setup;
\ No newline at end of file
+DROP TABLE IF EXISTS setup;
+DROP TABLE IF EXISTS giveaway_entries;
+DROP TABLE IF EXISTS giveaway_winners;
+DROP TABLE IF EXISTS schema_version;
+DROP TABLE IF EXISTS giveaways_archive;
+DROP TABLE IF EXISTS command_sync;
+DROP TABLE IF EXISTS catch_up;
@@ -0,0 +1,146 @@
+"""
+Named statements prepared on every pool connection, see EasySQL.
+"""
+
+GIVEAWAYS = {
+    "giveaway_by_id": "SELECT * FROM giveaways WHERE id = $1",
+    "archived_giveaway_by_id": "SELECT * FROM giveaways_archive WHERE id = $1",
+    # undrawn covers drawn giveaways whose winners weren't announced yet, the
+    # draw that announces them finishes the job
+    "undrawn_giveaway": "SELECT * FROM giveaways WHERE id = $1 AND NOT announced",
+    "undrawn_giveaway_by_message": (
+        "SELECT * FROM giveaways WHERE message_id = $1 AND NOT announced"
+    ),
+    # the shard of a guild is (guild_id >> 22) % shard_count, these only
+    # return giveaways of the shards given as $n::int[]
+    "undrawn_giveaways": """
+        SELECT * FROM giveaways
+        WHERE NOT announced AND (guild_id >> 22) % $1 = ANY($2::int[])
+    """,
+    "due_giveaways_after": """
+        SELECT * FROM giveaways
+        WHERE ended_at < $1 AND NOT announced
+        AND (guild_id >> 22) % $2 = ANY($3::int[])
+        AND (ended_at, id) > ($4, $5)
+        ORDER BY ended_at, id LIMIT $6
+    """,
+    "due_giveaways_count": """
+        SELECT count(*) FROM giveaways
+        WHERE ended_at < $1 AND NOT announced
+        AND (guild_id >> 22) % $2 = ANY($3::int[])
+        AND (ended_at, id) > ($4, $5)
+    """,
+    "catch_up_checkpoint": "SELECT ended_at, id FROM catch_up WHERE scope = $1",
+    "upsert_catch_up_checkpoint": """
+        INSERT INTO catch_up (scope, ended_at, id, updated_at) VALUES ($1, $2, $3, $4)
+        ON CONFLICT (scope) DO UPDATE SET ended_at = EXCLUDED.ended_at, id = EXCLUDED.id, updated_at = EXCLUDED.updated_at
+    """,
+    "delete_catch_up_checkpoint": "DELETE FROM catch_up WHERE scope = $1",
+    "insert_giveaway": """
+        INSERT INTO giveaways (id, owner_id, guild_id, channel_id, message_id, title, description, started_at, duration, ended_at, winner_id, conditions, prize, winners, role_weights)
+        VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, NULL, $11, $12, $13, $14)
+        RETURNING *
+    """,
+    "claim_giveaway": """
+        UPDATE giveaways SET claimed_by = $2, claim_expires = $3
+        WHERE id = $1 AND NOT announced
+        AND (claim_expires IS NULL OR claim_expires < $4)
+        RETURNING *
+    """,
+    "release_giveaway": """
+        UPDATE giveaways SET claimed_by = NULL, claim_expires = NULL
+        WHERE id = $1 AND claimed_by = $2
+    """,
+    # one statement so the winners and winner_id are saved together, and only
+    # by the holder of the claim ($2) of a giveaway not drawn yet. $5 is the
+    # duration of a giveaway ended early. Returns the number of rows drawn
+    "record_draw": """
+        WITH drawn AS (
+            UPDATE giveaways
+            SET ended_at = $3, winner_id = $4, duration = COALESCE($5, duration)
+            WHERE id = $1 AND claimed_by = $2 AND winner_id IS NULL
+            RETURNING id
+        ), saved AS (
+            INSERT INTO giveaway_winners (giveaway_id, user_id, position)
+            SELECT drawn.id, winner.user_id, winner.position
+            FROM drawn, unnest($6::bigint[]) WITH ORDINALITY AS winner(user_id, position)
+            ON CONFLICT DO NOTHING
+        )
+        SELECT count(*) FROM drawn
+    """,
+    "announce_giveaway": """
+        UPDATE giveaways SET announced = TRUE, claimed_by = NULL, claim_expires = NULL
+        WHERE id = $1 AND claimed_by = $2
+    """,
+    "giveaway_winners": (
+        "SELECT user_id FROM giveaway_winners WHERE giveaway_id = $1 ORDER BY position"
+    ),
+    "giveaway_entries": (
+        "SELECT user_id, weight FROM giveaway_entries WHERE giveaway_id = $1"
+    ),
+    "insert_entry": """
+        INSERT INTO giveaway_entries (giveaway_id, user_id, entered_at, weight)
+        VALUES ($1, $2, $3, $4)
+        ON CONFLICT DO NOTHING
+    """,
+    "delete_entry": (
+        "DELETE FROM giveaway_entries WHERE giveaway_id = $1 AND user_id = $2"
+    ),
+    "active_entrants": """
+        SELECT giveaway_id, user_id FROM giveaway_entries
+        WHERE giveaway_id = ANY($1::bigint[])
+        ORDER BY giveaway_id, user_id
+    """,
+    "command_hash": "SELECT hash FROM command_sync WHERE scope = $1",
+    "upsert_command_hash": """
+        INSERT INTO command_sync (scope, hash, synced_at) VALUES ($1, $2, $3)
+        ON CONFLICT (scope) DO UPDATE SET hash = EXCLUDED.hash, synced_at = EXCLUDED.synced_at
+    """,
+    "setup_by_guild": "SELECT * FROM setup WHERE guild_id = $1",
+    "upsert_setup": """
+        INSERT INTO setup (guild_id, giveaway_role_id) VALUES ($1, $2)
+        ON CONFLICT (guild_id) DO UPDATE SET giveaway_role_id = EXCLUDED.giveaway_role_id
+    """,
+}
+
+# Keyset pages of a guild's giveaways for list_giveaway, ordered on
+# (ended_at, id): active ones ending soonest first, ended ones latest first.
+# $1 guild id, $2 now, $3/$4 the (ended_at, id) key to continue from, $5 limit.
+def _giveaway_pages(
+    status: str, region: str, order: str, source: str = "giveaways"
+) -> dict:
+    after, before, backwards = (
+        (">", "<", "DESC") if order == "ASC" else ("<", ">", "ASC")
+    )
+    return {
+        f"{status}_giveaways_after": f"""
+            SELECT * FROM {source}
+            WHERE guild_id = $1 AND {region} AND (ended_at, id) {after} ($3, $4)
+            ORDER BY ended_at {order}, id {order} LIMIT $5
+        """,
+        f"{status}_giveaways_before": f"""
+            SELECT * FROM {source}
+            WHERE guild_id = $1 AND {region} AND (ended_at, id) {before} ($3, $4)
+            ORDER BY ended_at {backwards}, id {backwards} LIMIT $5
+        """,
+        # only for jumping to a page no neighbouring key is known for
+        f"{status}_giveaways_offset": f"""
+            SELECT * FROM {source} WHERE guild_id = $1 AND {region}
+            ORDER BY ended_at {order}, id {order} LIMIT $3 OFFSET $4
+        """,
+        f"{status}_giveaways_count": (
+            f"SELECT count(*) FROM {source} WHERE guild_id = $1 AND {region}"
+        ),
+    }
+
+
+GIVEAWAYS.update(_giveaway_pages("active", "ended_at > $2", "ASC"))
+# ended giveaways may have been moved to the archive, see sql/archive.py
+GIVEAWAYS.update(
+    _giveaway_pages(
+        "ended",
+        "ended_at < $2",
+        "DESC",
+        "(SELECT * FROM giveaways UNION ALL SELECT * FROM giveaways_archive) AS giveaways",
+    )
+)
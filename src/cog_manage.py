@@ -1,24 +1,78 @@
 import os
+import typing
 
+import discord
 from discord.ext import commands
 
+from .utils import tree_sync
+
 
 class CogsManagement(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
 
+    async def cog_load(self):
+        # run on every cluster worker, see src/utils/ipc.py
+        self.bot.ipc.register("load_extension", self.load_extension)
+        self.bot.ipc.register("unload_extension", self.unload_extension)
+        self.bot.ipc.register("reload_extension", self.reload_extension)
+        self.bot.ipc.register("reload_all", self.reload_all)
+
+    async def cog_unload(self):
+        for name in (
+            "load_extension",
+            "unload_extension",
+            "reload_extension",
+            "reload_all",
+        ):
+            self.bot.ipc.unregister(name)
+
+    async def load_extension(self, cog: str):
+        await self.bot.load_extension(cog)
+
+    async def unload_extension(self, cog: str):
+        await self.bot.unload_extension(cog)
+
+    async def reload_extension(self, cog: str):
+        await self.bot.unload_extension(cog)
+        await self.bot.load_extension(cog)
+
+    async def reload_all(self):
+        errors = []
+        for cog in os.listdir("./src"):
+            if cog == "cog_manage.py":
+                continue
+            if not cog.endswith(".py"):
+                continue
+            try:
+                await self.reload_extension("src." + cog[:-3])
+            except Exception as e:
+                errors.append(f"{cog[:-3]}: {type(e).__name__} - {e}")
+        return errors
+
+    async def broadcast(self, ctx, command: str, **args):
+        """Run a command on every worker and report how it went."""
+        replies = await self.bot.ipc.broadcast(command, **args)
+        errors = []
+        for reply in replies:
+            prefix = f"#{reply['cluster']} " if len(replies) > 1 else ""
+            if "error" in reply:
+                errors.append(f"{prefix}{reply['error']}")
+            else:
+                errors.extend(f"{prefix}{error}" for error in reply["result"] or ())
+        if errors:
+            for error in errors:
+                await ctx.send(f"**`ERROR:`** {error}")
+        else:
+            await ctx.send(f"**`SUCCESS`**")
+
     @commands.command(hidden=True)
     @commands.is_owner()
     async def load(self, ctx, *, cog: str):
         """
         Loads a cog.
         """
-        try:
-            await self.bot.load_extension(cog)
-        except Exception as e:
-            await ctx.send(f"**`ERROR:`** {type(e).__name__} - {e}")
-        else:
-            await ctx.send(f"**`SUCCESS`**")
+        await self.broadcast(ctx, "load_extension", cog=cog)
 
     @commands.command(hidden=True)
     @commands.is_owner()
@@ -26,12 +80,7 @@ class CogsManagement(commands.Cog):
         """
         Unloads a cog.
         """
-        try:
-            await self.bot.unload_extension(cog)
-        except Exception as e:
-            await ctx.send(f"**`ERROR:`** {type(e).__name__} - {e}")
-        else:
-            await ctx.send(f"**`SUCCESS`**")
+        await self.broadcast(ctx, "unload_extension", cog=cog)
 
     @commands.command(hidden=True)
     @commands.is_owner()
@@ -39,14 +88,7 @@ class CogsManagement(commands.Cog):
         """
         Reloads a cog.
         """
-        cog = "src." + cog
-        try:
-            await self.bot.unload_extension(cog)
-            await self.bot.load_extension(cog)
-        except Exception as e:
-            await ctx.send(f"**`ERROR:`** {type(e).__name__} - {e}")
-        else:
-            await ctx.send(f"**`SUCCESS`**")
+        await self.broadcast(ctx, "reload_extension", cog="src." + cog)
 
     @commands.command(hidden=True)
     @commands.is_owner()
@@ -54,18 +96,42 @@ class CogsManagement(commands.Cog):
         """
         Reloads all cogs.
         """
-        for cog in os.listdir("./src"):
-            if cog == "cog_manage.py":
-                continue
-            if not cog.endswith(".py"):
-                continue
-            try:
-                await self.bot.unload_extension("src." + cog[:-3])
-                await self.bot.load_extension("src." + cog[:-3])
-            except Exception as e:
-                await ctx.send(f"**`ERROR:`** {type(e).__name__} - {e}")
-            else:
-                await ctx.send(f"**`SUCCESS`**")
+        await self.broadcast(ctx, "reload_all")
+
+    @commands.command(hidden=True)
+    @commands.is_owner()
+    async def sync(
+        self, ctx, mode: str = "force", guild: typing.Optional[discord.Guild] = None
+    ):
+        """
+        Syncs application commands, or shows how they differ from Discord's with `diff`.
+        """
+        if mode == "diff":
+            lines = []
+            for scope in [guild] if guild is not None else tree_sync.scopes(self.bot):
+                changes = await tree_sync.diff(self.bot, scope)
+                name = scope.name if scope is not None else "Global"
+                summary = " ".join(
+                    f"{sign}{command}"
+                    for sign, key in (
+                        ("+", "added"),
+                        ("-", "removed"),
+                        ("~", "changed"),
+                    )
+                    for command in changes[key]
+                )
+                lines.append(f"{name}: {summary or 'up to date'}")
+            await ctx.send("\n".join(lines))
+            return
+        if mode != "force":
+            await ctx.send("**`ERROR:`** mode must be force or diff")
+            return
+        try:
+            await tree_sync.sync(self.bot, self.bot.db, guild, force=True)
+        except Exception as e:
+            await ctx.send(f"**`ERROR:`** {type(e).__name__} - {e}")
+        else:
+            await ctx.send(f"**`SUCCESS`**")
 
 
 async def setup(bot):
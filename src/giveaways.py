@@ -1,17 +1,77 @@
+import array
+import asyncio
+import contextlib
 import datetime
 import enum
 import logging
 import os
 import random
+import secrets
 import string
 import typing
 
 import discord
-from discord.ext import commands, tasks
+from discord.ext import commands, menus, tasks
 
-from sql.easy_sql import EasySQL
+from sql.archive import archive
 
+from .utils.cache import TTLCache
+from .utils.conditions import (
+    Condition,
+    ConditionError,
+    Everyone,
+    compile_condition,
+    entry_weight,
+    parse_role_weights,
+)
+from .utils.draw import reservoir_sample, weighted_sample
+from .utils.entrants import EntrantSet
+from .utils.giveaway_index import GiveawayIndex
+from .utils.outbound import OutboundQueue
+from .utils.paginator import Pages
+from .utils.scheduler import DeadlineScheduler
 from .utils.stuffs import dummy, random_id
+from .utils.workers import FinalizationPool
+
+# seconds a guild's setup row is served from memory
+SETTINGS_TTL = 300
+
+# seconds between entrant counter refreshes of a giveaway message
+LIVE_COUNTER_INTERVAL = int(os.environ.get("LIVE_COUNTER_INTERVAL", 15))
+
+# drawn giveaways move to the archive after this many days, see sql/archive.py
+ARCHIVE_AFTER_DAYS = float(os.environ.get("ARCHIVE_AFTER_DAYS", 30))
+# archived months older than this many days are dropped, unset keeps them forever
+RETENTION_DAYS = os.environ.get("RETENTION_DAYS")
+
+# giveaways that expired while the bot was offline are finalized this many at
+# once next to the live ones, a batch at a time
+CATCH_UP_CONCURRENCY = int(os.environ.get("CATCH_UP_CONCURRENCY", 4))
+CATCH_UP_BATCH = 100
+
+# the most winners a giveaway can have, all of them are mentioned when it ends
+MAX_WINNERS = 50
+# discord's limit on the length of an embed field value
+EMBED_FIELD_LIMIT = 1024
+
+# seconds a draw holds its claim on a giveaway, after that another worker
+# may take it over, see Giveaways.claim
+CLAIM_LEASE = 600
+# winner_id of a drawn giveaway nobody entered, NULL means not drawn yet
+NO_WINNER = 0
+
+_missing = object()
+
+
+async def winners_of(db, giveaway) -> typing.List[int]:
+    """Every winner of a drawn giveaway, in draw order."""
+    if giveaway["winner_id"] in (None, NO_WINNER):
+        return []
+    if giveaway["winners"] == 1:
+        return [giveaway["winner_id"]]
+    return [
+        row["user_id"] for row in await db.fetch("giveaway_winners", giveaway["id"])
+    ]
 
 
 class Status(enum.Enum):
@@ -19,6 +79,168 @@ class Status(enum.Enum):
     ended = "ended"
 
 
+class GiveawayPageSource(menus.PageSource):
+    """
+    Lazily fetched pages of a guild's giveaways.
+
+    Pages are keyset paginated on ``(ended_at, id)``: moving to a neighbouring
+    page continues from the first or last key of a page already shown, so
+    every page view is one query for the rows it displays whatever the
+    guild's history size. Only jumps to a far page fall back to an offset.
+    """
+
+    def __init__(self, db, guild_id: int, status: str, *, per_page: int = 5) -> None:
+        self.db = db
+        self.guild_id = guild_id
+        self.status = status
+        self.per_page = per_page
+        self.now = datetime.datetime.now().timestamp()
+        self.total: typing.Optional[int] = None
+        # page number -> (first key, last key) of pages fetched so far
+        self._keys: typing.Dict[int, typing.Tuple[tuple, tuple]] = {}
+
+    async def prepare(self) -> None:
+        if self.total is not None:
+            return
+        self.total = await self.db.fetchval(
+            f"{self.status}_giveaways_count", self.guild_id, self.now
+        )
+
+    def is_paginating(self) -> bool:
+        return self.total > self.per_page
+
+    def get_max_pages(self) -> int:
+        return max(1, -(-self.total // self.per_page))
+
+    @staticmethod
+    def _key(giveaway) -> tuple:
+        return giveaway["ended_at"], giveaway["id"]
+
+    async def get_page(self, page_number: int) -> typing.List:
+        if not 0 <= page_number < self.get_max_pages():
+            raise IndexError(page_number)
+        if page_number == 0:
+            # every row of the listing is past this key
+            giveaways = await self.db.fetch(
+                f"{self.status}_giveaways_after",
+                self.guild_id,
+                self.now,
+                self.now,
+                0,
+                self.per_page,
+            )
+        elif page_number - 1 in self._keys:
+            ended_at, id = self._keys[page_number - 1][1]
+            giveaways = await self.db.fetch(
+                f"{self.status}_giveaways_after",
+                self.guild_id,
+                self.now,
+                ended_at,
+                id,
+                self.per_page,
+            )
+        elif page_number + 1 in self._keys:
+            ended_at, id = self._keys[page_number + 1][0]
+            giveaways = await self.db.fetch(
+                f"{self.status}_giveaways_before",
+                self.guild_id,
+                self.now,
+                ended_at,
+                id,
+                self.per_page,
+            )
+            giveaways.reverse()
+        elif page_number == self.get_max_pages() - 1:
+            # walk back from past the far end of the listing
+            giveaways = await self.db.fetch(
+                f"{self.status}_giveaways_before",
+                self.guild_id,
+                self.now,
+                float("inf") if self.status == "active" else float("-inf"),
+                0,
+                self.total - page_number * self.per_page,
+            )
+            giveaways.reverse()
+        else:
+            giveaways = await self.db.fetch(
+                f"{self.status}_giveaways_offset",
+                self.guild_id,
+                self.now,
+                self.per_page,
+                page_number * self.per_page,
+            )
+        if giveaways:
+            self._keys[page_number] = (
+                self._key(giveaways[0]),
+                self._key(giveaways[-1]),
+            )
+        return giveaways
+
+    async def format_page(self, menu, giveaways) -> discord.Embed:
+        embed = discord.Embed(
+            title=f"{self.total} giveaways found with status {self.status}",
+            color=discord.Color.blurple(),
+        )
+        for giveaway in giveaways:
+            if giveaway["winner_id"] is None:
+                winner = "No winner yet."
+            else:
+                # five of these share the 6000 characters of an embed
+                winner = Giveaways.mention_winners(
+                    await winners_of(self.db, giveaway), EMBED_FIELD_LIMIT // 2
+                )
+            embed.add_field(
+                name=giveaway["title"],
+                value=f"Prize: {giveaway['prize']}\n"
+                f"ID: {giveaway['id']}\n"
+                f"Created by: <@{giveaway['owner_id']}>\n"
+                f"Ends: <t:{int(giveaway['ended_at'])}:f>\n"
+                f"Winner: {winner}",
+                inline=False,
+            )
+        embed.set_footer(text=f"Page {menu.current_page + 1}/{self.get_max_pages()}")
+        return embed
+
+
+class EnterButton(
+    discord.ui.DynamicItem[discord.ui.Button],
+    template=r"giveaway:(?P<id>[0-9]+):enter",
+):
+    """
+    The enter button of a giveaway.
+
+    One dynamic item matches the button of every giveaway by its custom id,
+    so it is registered once and keeps working across restarts.
+    """
+
+    def __init__(self, giveaway_id: int) -> None:
+        super().__init__(
+            discord.ui.Button(
+                label="Enter",
+                emoji="🎉",
+                style=discord.ButtonStyle.blurple,
+                custom_id=f"giveaway:{giveaway_id}:enter",
+            )
+        )
+        self.giveaway_id = giveaway_id
+
+    @classmethod
+    async def from_custom_id(
+        cls, interaction: discord.Interaction, item: discord.ui.Button, match
+    ) -> "EnterButton":
+        return cls(int(match["id"]))
+
+    async def callback(self, interaction: discord.Interaction) -> None:
+        cog = interaction.client.get_cog("Giveaways")
+        if cog is None:
+            await interaction.response.send_message(
+                "Giveaways are unavailable right now, try again later.",
+                ephemeral=True,
+            )
+            return
+        await cog.enter_button(interaction, self.giveaway_id)
+
+
 class Giveaways(commands.Cog):
     """
     A giveaway commands group!
@@ -31,15 +253,84 @@ class Giveaways(commands.Cog):
     def __init__(self, bot) -> None:
         self.bot = bot
         self.db = self.bot.db
+        self.resolver = self.bot.resolver
         self.log = logging.getLogger("GiveawayBot.GiveawayCog")
+        self.scheduler = DeadlineScheduler(self.end_scheduled_giveaway)
+        self.finalizer = FinalizationPool(
+            self.finish_giveaway,
+            concurrency=int(os.environ.get("FINALIZE_CONCURRENCY", 8)),
+            no_retry=(discord.NotFound, discord.Forbidden),
+        )
+        self.catch_up_pool = FinalizationPool(
+            self.finish_giveaway,
+            concurrency=CATCH_UP_CONCURRENCY,
+            no_retry=(discord.NotFound, discord.Forbidden),
+        )
+        self.catch_up_task: typing.Optional[asyncio.Task] = None
+        # (done, total) of the running catch-up, see old_giveaway
+        self.catch_up_progress: typing.Optional[typing.Tuple[int, int]] = None
+        self.index = GiveawayIndex()
+        self.outbound = OutboundQueue()
+        self.entrants: typing.Dict[int, EntrantSet] = {}
+        self.dirty: typing.Set[int] = set()
+        # who left each giveaway while load_schedule streams its entrants
+        self.left_while_loading: typing.Dict[int, typing.Set[int]] = {}
+        # giveaways claimed by a draw of this process, see claim
+        self.drawing: typing.Set[int] = set()
+        self.conditions: typing.Dict[int, Condition] = {}
+        self.role_weights: typing.Dict[int, typing.Dict[int, float]] = {}
+        self.settings: TTLCache[int, typing.Optional[typing.Mapping]] = TTLCache(
+            ttl=SETTINGS_TTL
+        )
+        self.scheduler_ready = False
+        self.bot.add_dynamic_items(EnterButton)
+        # what other processes sharing the database did, see sql/easy_sql.py
+        self.events = {
+            "giveaway_created": self.on_giveaway_created,
+            "giveaway_ended": self.on_giveaway_ended,
+            "setup_changed": self.on_setup_changed,
+        }
+
+    async def cog_load(self) -> None:
+        for event, callback in self.events.items():
+            await self.db.subscribe(event, callback)
+        if self.bot.is_ready():
+            # reloaded, on_ready won't fire for this instance
+            await self.start_scheduler()
+
+    async def cog_unload(self) -> None:
+        for event, callback in self.events.items():
+            await self.db.unsubscribe(event, callback)
+        self.bot.remove_dynamic_items(EnterButton)
+        self.scheduler.stop()
+        self.refresh_entrants.cancel()
+        self.archive_giveaways.cancel()
+        self.outbound.close()
+        self.finalizer.cancel()
+        if self.catch_up_task is not None:
+            self.catch_up_task.cancel()
+        self.catch_up_pool.cancel()
 
     @commands.Cog.listener()
     async def on_ready(self):
-        self.log.info("Checking old giveaways")
-        await self.old_giveaway()
-        self.log.info("Starting giveaway task loop")
-        self.check_giveaways.start()
-        self.log.info("Tasks started")
+        if self.scheduler_ready:
+            # on_ready fires again after every reconnect
+            return
+        await self.start_scheduler()
+
+    async def start_scheduler(self) -> None:
+        """Load the schedule, start the background loops and catch up."""
+        self.scheduler_ready = True
+        cutoff = datetime.datetime.now().timestamp()
+        self.log.info("Loading giveaway schedule")
+        await self.load_schedule(cutoff)
+        self.scheduler.start()
+        self.refresh_entrants.start()
+        self.archive_giveaways.start()
+        self.log.info("Scheduler started")
+        # the backlog runs in the background so the live giveaways don't
+        # wait behind it
+        self.catch_up_task = asyncio.create_task(self.old_giveaway(cutoff))
 
     def parse_time(
         self, time: typing.Union[datetime.timedelta, int, str]
@@ -102,27 +393,105 @@ class Giveaways(commands.Cog):
         if ctx.invoked_subcommand is None:
             await ctx.send_help(ctx.command)
 
-    def parse_condition(self, condition: str) -> typing.Optional[typing.Callable]:
-        if condition == "everyone":
-            return lambda m: True
-        elif condition.startswith("role"):
-            role = condition.split(" ")[1]
-            return lambda m: role in [r.id for r in m.roles]
-        elif condition.startswith("not role"):
-            role = condition.split(" ")[1]
-            return lambda m: role not in [r.name for r in m.roles]
-        elif condition.startswith("account age"):
-            age = int(condition.split(" ")[1])
-            return lambda m: (datetime.datetime.now() - m.created_at).days >= age
-        elif condition.startswith("not account age"):
-            age = int(condition.split(" ")[1])
-            return lambda m: (datetime.datetime.now() - m.created_at).days < age
-        else:
-            badarg = commands.BadArgument(f"{condition} is not a valid condition.\n")
+    def parse_condition(self, condition: str) -> Condition:
+        try:
+            return compile_condition(condition)
+        except ConditionError as e:
+            badarg = commands.BadArgument(f"{condition} is not a valid condition.\n{e}")
             badarg.param = dummy()
             badarg.param.name = "condition"
             raise badarg
 
+    def get_condition(self, giveaway) -> typing.Optional[Condition]:
+        """Return the compiled condition of a giveaway, compiling it once."""
+        if giveaway["conditions"] is None:
+            return None
+        condition = self.conditions.get(giveaway["id"])
+        if condition is None:
+            try:
+                condition = compile_condition(giveaway["conditions"])
+            except ConditionError as e:
+                self.log.warning(
+                    f"Giveaway {giveaway['id']} has an invalid condition, ignoring it: {e}"
+                )
+                condition = Everyone()
+            self.conditions[giveaway["id"]] = condition
+        return condition
+
+    def parse_role_weights(self, weights: str) -> typing.Dict[int, float]:
+        try:
+            return parse_role_weights(weights)
+        except ConditionError as e:
+            badarg = commands.BadArgument(f"{weights} are not valid weights.\n{e}")
+            badarg.param = dummy()
+            badarg.param.name = "weights"
+            raise badarg
+
+    def get_role_weights(self, giveaway) -> typing.Optional[typing.Dict[int, float]]:
+        """Return the parsed bonus entry multipliers of a giveaway, parsing them once."""
+        if giveaway["role_weights"] is None:
+            return None
+        weights = self.role_weights.get(giveaway["id"])
+        if weights is None:
+            try:
+                weights = parse_role_weights(giveaway["role_weights"])
+            except ConditionError as e:
+                self.log.warning(
+                    f"Giveaway {giveaway['id']} has invalid role weights, ignoring them: {e}"
+                )
+                weights = {}
+            self.role_weights[giveaway["id"]] = weights
+        return weights
+
+    async def get_settings(self, guild_id: int) -> typing.Optional[typing.Mapping]:
+        """The guild's setup row, cached for SETTINGS_TTL seconds (None when not set up)."""
+        settings = self.settings.get(guild_id, _missing)
+        if settings is _missing:
+            settings = await self.db.fetchrow("setup_by_guild", guild_id)
+            self.settings[guild_id] = settings
+        return settings
+
+    def owns(self, guild_id: int) -> bool:
+        """Whether the giveaways of this guild are scheduled by this process."""
+        shard_count, shards = self.local_shards()
+        return (guild_id >> 22) % shard_count in shards
+
+    async def on_giveaway_created(self, data: typing.Mapping) -> None:
+        """Another process created a giveaway, schedule it if its guild is ours."""
+        if not self.scheduler_ready or not self.owns(data["guild_id"]):
+            # load_schedule picks it up from the database
+            return
+        if self.index.get_by_id(data["id"]) is not None:
+            return
+        giveaway = await self.db.fetchrow("undrawn_giveaway", data["id"])
+        if giveaway is None:
+            return
+        self.index.add(giveaway)
+        self.get_condition(giveaway)
+        self.get_role_weights(giveaway)
+        entrants = array.array("Q")
+        async for entry in self.db.cursor("active_entrants", [giveaway["id"]]):
+            entrants.append(entry["user_id"])
+        self.entrants[giveaway["id"]] = EntrantSet.from_sorted(entrants)
+        self.scheduler.schedule(giveaway["id"], giveaway["ended_at"])
+
+    async def on_giveaway_ended(self, data: typing.Mapping) -> None:
+        """Another process drew a giveaway."""
+        self.forget_giveaway(data["id"])
+
+    async def on_setup_changed(self, data: typing.Mapping) -> None:
+        self.settings.invalidate(data["guild_id"])
+
+    def forget_giveaway(self, giveaway_id: int) -> None:
+        """Drop a drawn giveaway from every in-memory structure."""
+        giveaway_id = int(giveaway_id)
+        self.scheduler.cancel(giveaway_id)
+        self.index.remove(giveaway_id)
+        self.conditions.pop(giveaway_id, None)
+        self.role_weights.pop(giveaway_id, None)
+        self.entrants.pop(giveaway_id, None)
+        self.dirty.discard(giveaway_id)
+
     @giveaway.command()
     async def create(
         self,
@@ -134,20 +503,20 @@ class Giveaways(commands.Cog):
         channel: typing.Optional[discord.TextChannel] = None,
         *,
         condition: typing.Optional[str] = None,
+        winners: int = 1,
+        weights: typing.Optional[str] = None,
+        button: bool = False,
     ) -> None:
-        """Create a giveaway."""
+        """Create a giveaway.
+
+        `weights` gives bonus entries to roles, e.g. `@Booster=2,@Supporter=3`.
+        With `button` members enter with a button instead of a 🎉 reaction.
+        The condition takes the rest of a prefix command, so `winners`,
+        `weights` and `button` are only options of the slash command.
+        """
         await ctx.defer()
-        setup_db = await EasySQL().connect(
-            host=os.environ.get("DB_HOST"),
-            database="giveaways",
-            user="giveaway_bot",
-            password=os.environ["DB_PASS"],
-        )
-        roles = ctx.author.roles
-        role_id = await setup_db.fetch(
-            f"SELECT * FROM setup WHERE guild_id = {ctx.guild.id}"
-        )
-        if not role_id:
+        settings = await self.get_settings(ctx.guild.id)
+        if settings is None:
             role_id = 0
             await ctx.send(
                 embed=discord.Embed(
@@ -159,13 +528,12 @@ class Giveaways(commands.Cog):
                 )
             )
         else:
-            role_id = role_id[0]["giveaway_role_id"]
+            role_id = settings["giveaway_role_id"]
         if (
-            int(role_id) not in [r.id for r in roles]
-            or not ctx.author.guild_permissions.administrator
+            ctx.author.get_role(role_id) is None
+            and not ctx.author.guild_permissions.administrator
         ):
             raise commands.MissingPermissions(["NoGiveawayRoleError"])
-        await setup_db.close()
         time = self.parse_time(time)
         if time is None:
             badarg = commands.BadArgument(
@@ -182,33 +550,79 @@ class Giveaways(commands.Cog):
             badarg.param.name = "time"
             raise badarg
 
+        if winners < 1:
+            badarg = commands.BadArgument("There must be at least 1 winner.")
+            badarg.param = dummy()
+            badarg.param.name = "winners"
+            raise badarg
+        if winners > MAX_WINNERS:
+            badarg = commands.BadArgument(
+                f"There can be at most {MAX_WINNERS} winners."
+            )
+            badarg.param = dummy()
+            badarg.param.name = "winners"
+            raise badarg
+
+        condition_func = None
         if condition is not None:
             condition_func = self.parse_condition(condition)
+        role_weights = None
+        if weights is not None:
+            role_weights = self.parse_role_weights(weights)
 
-        embed = discord.Embed(
-            title=title,
-            description=description,
-            color=discord.Color.blurple(),
-        )
         id = random_id()
         now = datetime.datetime.now()
-        embed.add_field(name="Prize", value=prize)
-        embed.add_field(name="Time", value=str(time))
-        embed.add_field(name="Channel", value=channel.mention)
-        embed.add_field(name="Condition", value=condition if condition else "None")
-        embed.add_field(name="ID", value=id)
-        embed.add_field(name="Created by", value=ctx.author.mention)
-        embed.add_field(name="Created at", value=now.strftime("%d/%m/%Y %H:%M:%S"))
-        embed.set_footer(text=f"Giveaway created by {ctx.author.name}")
+        embed = await self.active_embed(
+            {
+                "id": int(id),
+                "owner_id": ctx.author.id,
+                "channel_id": channel.id,
+                "title": title,
+                "description": description,
+                "started_at": now.timestamp(),
+                "duration": int(time.total_seconds()),
+                "ended_at": (now + time).timestamp(),
+                "conditions": condition,
+                "prize": prize,
+                "winners": winners,
+                "role_weights": weights,
+            }
+        )
 
-        message = await channel.send(embed=embed)
-        await message.add_reaction("🎉")
+        if button:
+            view = discord.ui.View(timeout=None)
+            view.add_item(EnterButton(int(id)))
+            message = await self.outbound.send(channel, embed=embed, view=view)
+        else:
+            message = await self.outbound.send(channel, embed=embed)
+            self.outbound.detach(self.outbound.add_reaction(message, "🎉"))
 
-        await self.db.execute(
-            f"""
-            INSERT INTO giveaways (id, owner_id, guild_id, channel_id, message_id, title, description, started_at, duration, ended_at, winner_id, conditions, prize)
-            VALUES ({id}, {ctx.author.id},{message.guild.id}, {message.channel.id},{message.id}, '{title}', '{description}', {now.timestamp()}, {time.total_seconds()}, '{(now + time).timestamp()}', NULL, {'NULL' if condition is None else f"'{condition}'"}, '{prize}')
-            """
+        giveaway = await self.db.fetchrow(
+            "insert_giveaway",
+            int(id),
+            ctx.author.id,
+            message.guild.id,
+            message.channel.id,
+            message.id,
+            title,
+            description,
+            now.timestamp(),
+            int(time.total_seconds()),
+            (now + time).timestamp(),
+            condition,
+            prize,
+            winners,
+            weights,
+        )
+        self.index.add(giveaway)
+        self.entrants[giveaway["id"]] = EntrantSet()
+        if condition_func is not None:
+            self.conditions[giveaway["id"]] = condition_func
+        if role_weights is not None:
+            self.role_weights[giveaway["id"]] = role_weights
+        self.scheduler.schedule(id, (now + time).timestamp())
+        await self.db.publish(
+            "giveaway_created", id=giveaway["id"], guild_id=giveaway["guild_id"]
         )
         await ctx.send(
             embed=discord.Embed(
@@ -219,150 +633,302 @@ class Giveaways(commands.Cog):
             )
         )
 
-    @tasks.loop(seconds=1)
-    async def check_giveaways(self) -> None:
-        """Check giveaways."""
-        await self.bot.wait_until_ready()
-        now = datetime.datetime.now()
-        giveaways = await self.db.fetch(
-            f"SELECT * FROM giveaways WHERE ended_at < {now.timestamp()} AND winner_id IS NULL"
+    async def active_embed(self, giveaway, entrants: int = 0) -> discord.Embed:
+        """The embed of a running giveaway."""
+        embed = discord.Embed(
+            title=giveaway["title"],
+            description=giveaway["description"],
+            color=discord.Color.blurple(),
         )
-        for giveaway in giveaways:
+        started_at = datetime.datetime.fromtimestamp(giveaway["started_at"])
+        embed.add_field(name="Prize", value=giveaway["prize"])
+        embed.add_field(
+            name="Time", value=str(datetime.timedelta(seconds=giveaway["duration"]))
+        )
+        # rendered by the client, so the countdown stays live without edits
+        embed.add_field(name="Ends", value=f"<t:{int(giveaway['ended_at'])}:R>")
+        embed.add_field(name="Entrants", value=str(entrants))
+        embed.add_field(name="Channel", value=f"<#{giveaway['channel_id']}>")
+        embed.add_field(name="Winners", value=str(giveaway["winners"]))
+        embed.add_field(name="Condition", value=giveaway["conditions"] or "None")
+        role_weights = self.get_role_weights(giveaway)
+        if role_weights:
+            embed.add_field(
+                name="Bonus entries",
+                value="\n".join(
+                    f"<@&{role_id}> x{weight:g}"
+                    for role_id, weight in role_weights.items()
+                ),
+            )
+        embed.add_field(name="ID", value=giveaway["id"])
+        embed.add_field(name="Created by", value=f"<@{giveaway['owner_id']}>")
+        embed.add_field(
+            name="Created at", value=started_at.strftime("%d/%m/%Y %H:%M:%S")
+        )
+        try:
+            owner = await self.resolver.user(giveaway["owner_id"])
+        except discord.HTTPException:
+            owner = None
+        embed.set_footer(
+            text=f"Giveaway created by {owner.name if owner else giveaway['owner_id']}"
+        )
+        return embed
+
+    @tasks.loop(seconds=LIVE_COUNTER_INTERVAL)
+    async def refresh_entrants(self) -> None:
+        """Flush entrant counts of changed giveaways, at most one edit per message per tick."""
+        dirty, self.dirty = self.dirty, set()
+        now = datetime.datetime.now().timestamp()
+        for giveaway_id in dirty:
+            giveaway = self.index.get_by_id(giveaway_id)
+            if giveaway is None:
+                continue
+            if giveaway["ended_at"] <= now or giveaway_id in self.drawing:
+                # the winners are about to replace the counter
+                continue
             channel = self.bot.get_channel(giveaway["channel_id"])
             if channel is None:
                 continue
-            message = await channel.fetch_message(giveaway["message_id"])
-            if message is None:
-                continue
-            winner = [member async for member in message.reactions[0].users()]
-            winner.remove(self.bot.user)
-            winner = random.choice(winner)
-            if winner is None:
-                winner = dummy()
-                winner.mention = "No one"
-            await message.edit(
-                content=f"{winner.mention} won the giveaway!",
-                embed=discord.Embed(
-                    title=giveaway["title"],
-                    description=giveaway["description"],
-                    color=discord.Color.blurple(),
-                )
-                .add_field(name="Prize", value=giveaway["prize"])
-                .add_field(name="Winner", value=winner.mention)
-                .add_field(name="ID", value=giveaway["id"])
-                .add_field(
-                    name="Created by",
-                    value=self.bot.get_user(int(giveaway["owner_id"])).mention,
+            try:
+                embed = await self.active_embed(
+                    giveaway, len(self.entrants.get(giveaway_id, ()))
                 )
-                .add_field(
-                    name="Created at",
-                    value=datetime.datetime.fromtimestamp(
-                        giveaway["started_at"]
-                    ).strftime("%d/%m/%Y %H:%M:%S"),
+                self.outbound.detach(
+                    self.outbound.edit(
+                        channel.get_partial_message(giveaway["message_id"]),
+                        embed=embed,
+                    )
                 )
-                .add_field(
-                    name="Ended at",
-                    value=datetime.datetime.fromtimestamp(
-                        giveaway["ended_at"]
-                    ).strftime("%d/%m/%Y %H:%M:%S"),
+            except Exception:
+                # one bad giveaway mustn't end the loop for all of them
+                self.log.exception(
+                    f"Refreshing the counter of giveaway {giveaway_id} failed"
                 )
-                .set_footer(text=f"Giveaway ended by {winner.mention}"),
-            )
-            await self.db.execute(
-                f"UPDATE giveaways SET ended_at = {now.timestamp()}, winner_id = {winner.id} WHERE id = {giveaway['id']}"
+
+    @tasks.loop(hours=1)
+    async def archive_giveaways(self) -> None:
+        """Keep the giveaways table down to the working set."""
+        try:
+            await archive(
+                self.db,
+                archive_after=ARCHIVE_AFTER_DAYS * 86400,
+                retention=float(RETENTION_DAYS) * 86400 if RETENTION_DAYS else None,
             )
+        except Exception:
+            self.log.exception("Archiving giveaways failed")
 
-    async def old_giveaway(self) -> None:
-        """Check entire giveaway see if it expired if it is then forcing the winner."""
-        await self.bot.wait_until_ready()
-        now = datetime.datetime.now()
-        giveaways = await self.db.fetch(
-            f"SELECT * FROM giveaways WHERE ended_at < {now.timestamp()} AND winner_id IS NULL"
-        )
+    def local_shards(self) -> typing.Tuple[int, typing.List[int]]:
+        """The shard count and the shards run by this process.
+
+        Giveaways are scheduled and finalized by the process owning the
+        shard of their guild, so several processes never draw the same one.
+        """
+        shard_count = self.bot.shard_count or 1
+        if self.bot.shard_ids is None:
+            return shard_count, list(range(shard_count))
+        return shard_count, list(self.bot.shard_ids)
+
+    async def load_schedule(self, cutoff: typing.Optional[float] = None) -> None:
+        """Load the undrawn giveaways of our shards into the index and the scheduler.
+
+        Giveaways that ended before ``cutoff`` are left to :meth:`old_giveaway`.
+        """
+        giveaways = await self.db.fetch("undrawn_giveaways", *self.local_shards())
+        ids = [giveaway["id"] for giveaway in giveaways]
+        # entries made while the ledger streams in land in these empty sets
+        # and are merged with it at the end, the cursor doesn't see them
+        live = {id: EntrantSet() for id in ids}
+        self.entrants = dict(live)
+        self.left_while_loading = {id: set() for id in ids}
+        self.index.load(giveaways)
         for giveaway in giveaways:
-            channel = self.bot.get_channel(giveaway["channel_id"])
-            if channel is None:
+            if cutoff is None or giveaway["ended_at"] >= cutoff:
+                self.scheduler.schedule(giveaway["id"], giveaway["ended_at"])
+            self.get_condition(giveaway)
+            self.get_role_weights(giveaway)
+        loaded: typing.Dict[int, array.array] = {}
+        try:
+            async for entry in self.db.cursor("active_entrants", ids, prefetch=10000):
+                loaded.setdefault(entry["giveaway_id"], array.array("Q")).append(
+                    entry["user_id"]
+                )
+        finally:
+            left_while_loading, self.left_while_loading = self.left_while_loading, {}
+        for id in ids:
+            if id not in self.entrants:
+                # drawn in the meantime
                 continue
-            message = await channel.fetch_message(giveaway["message_id"])
-            if message is None:
+            entrants = EntrantSet.from_sorted(loaded.pop(id, ()))
+            for user_id in live[id]:
+                entrants.add(user_id)
+            for user_id in left_while_loading[id]:
+                entrants.discard(user_id)
+            self.entrants[id] = entrants
+            if live[id] or left_while_loading[id]:
+                self.dirty.add(id)
+        self.log.info(f"Scheduled {len(giveaways)} giveaways")
+
+    async def end_scheduled_giveaway(self, giveaway_id: int) -> None:
+        """Called by the scheduler once a giveaway deadline has passed."""
+        await self.bot.wait_until_ready()
+        giveaway = self.index.get_by_id(giveaway_id)
+        if giveaway is None:
+            giveaway = await self.db.fetchrow("undrawn_giveaway", giveaway_id)
+            if giveaway is None:
+                return
+        self.finalize(giveaway)
+
+    def finalize(self, giveaway) -> None:
+        """Queue an expired giveaway, unless catch-up is already on it."""
+        if giveaway["id"] not in self.catch_up_pool:
+            self.finalizer.submit(giveaway)
+
+    async def iter_entries(
+        self, giveaway_id: int, *, weighted: bool = False
+    ) -> typing.AsyncIterator:
+        """Stream the entry ledger of a giveaway through a server side cursor."""
+        async for entry in self.db.cursor(
+            "giveaway_entries", int(giveaway_id), prefetch=10000
+        ):
+            if weighted:
+                yield entry["user_id"], entry["weight"]
+            else:
+                yield entry["user_id"]
+
+    async def draw_winners(
+        self, giveaway, message: typing.Optional[discord.Message] = None
+    ) -> typing.List[int]:
+        """Draw the winners of a giveaway without replacement.
+
+        Unweighted giveaways are drawn from a snapshot of the in-memory
+        entrant set, or with a streaming reservoir sample of the ledger when
+        it isn't (fully) loaded. Weighted ones load the ledger into flat arrays and
+        draw from an alias table.
+        """
+        k = giveaway["winners"]
+        if self.get_role_weights(giveaway):
+            user_ids = array.array("q")
+            weights = array.array("d")
+            async for user_id, weight in self.iter_entries(
+                giveaway["id"], weighted=True
+            ):
+                user_ids.append(user_id)
+                weights.append(weight)
+            winners = [user_ids[i] for i in weighted_sample(weights, k)]
+        elif (
+            giveaway["id"] in self.entrants
+            and giveaway["id"] not in self.left_while_loading
+        ):
+            entrants = self.entrants[giveaway["id"]].snapshot()
+            winners = [
+                entrants[i]
+                for i in random.sample(range(len(entrants)), min(k, len(entrants)))
+            ]
+        else:
+            winners = await reservoir_sample(self.iter_entries(giveaway["id"]), k)
+        reaction = None
+        if message is not None:
+            reaction = discord.utils.get(message.reactions, emoji="🎉")
+        if not winners and reaction is not None and message.guild is not None:
+            # giveaways started before the entry ledger only have reactions
+            reactors = self.iter_reactors(giveaway, reaction, message.guild)
+            if self.get_role_weights(giveaway):
+                user_ids = array.array("q")
+                weights = array.array("d")
+                async for user_id, weight in reactors:
+                    user_ids.append(user_id)
+                    weights.append(weight)
+                winners = [user_ids[i] for i in weighted_sample(weights, k)]
+            else:
+                drawn = await reservoir_sample(reactors, k)
+                winners = [user_id for user_id, _ in drawn]
+        return winners
+
+    async def iter_reactors(
+        self, giveaway, reaction: discord.Reaction, guild: discord.Guild
+    ) -> typing.AsyncIterator[typing.Tuple[int, float]]:
+        """Yield ``(user_id, weight)`` for the reactors that may win a giveaway.
+
+        Applies the same checks as entering through a reaction: bots, people
+        who left the server and members failing the condition are skipped.
+        """
+        condition = self.get_condition(giveaway)
+        weights = self.get_role_weights(giveaway)
+        async for user in reaction.users():
+            if user.bot:
                 continue
-            winner = [member async for member in message.reactions[0].users()]
-            winner.remove(self.bot.user)
-            winner = random.choice(winner)
-            if winner is None:
-                winner = dummy()
-                winner.mention = "No one"
-                winner.id = None
-            await message.edit(
-                content=f"{winner.mention} won the giveaway!",
-                embed=discord.Embed(
-                    title=giveaway["title"],
-                    description=giveaway["description"],
-                    color=discord.Color.blurple(),
-                )
-                .add_field(name="Prize", value=giveaway["prize"])
-                .add_field(name="Winner", value=winner.mention)
-                .add_field(name="ID", value=giveaway["id"])
-                .add_field(
-                    name="Created by",
-                    value=self.bot.get_user(int(giveaway["owner_id"])).mention,
-                )
-                .add_field(
-                    name="Created at",
-                    value=datetime.datetime.fromtimestamp(
-                        giveaway["started_at"]
-                    ).strftime("%d/%m/%Y %H:%M:%S"),
-                )
-                .add_field(
-                    name="Ended at",
-                    value=datetime.datetime.fromtimestamp(
-                        giveaway["ended_at"]
-                    ).strftime("%d/%m/%Y %H:%M:%S"),
-                )
-                .set_footer(text=f"Giveaway ended by {winner.mention}"),
-            )
-            await self.db.execute(
-                f"UPDATE giveaways SET ended_at = {now.timestamp()}, winner_id = {winner.id} WHERE id = {giveaway['id']}"
-            )
+            member = await self.resolver.member(guild, user.id)
+            if member is None:
+                continue
+            if condition is not None and not condition(member):
+                continue
+            yield member.id, entry_weight(weights, member) if weights else 1.0
 
-    @giveaway.command()
-    async def end(self, ctx: discord.Interaction, giveaway_id: str) -> None:
-        """End a giveaway."""
-        await ctx.defer()
-        giveaway = await self.db.fetch(
-            f"SELECT * FROM giveaways WHERE id = {giveaway_id}"
+    async def settle_winners(
+        self,
+        giveaway,
+        message: typing.Optional[discord.Message],
+        ended_at: float,
+        duration: typing.Optional[int] = None,
+    ) -> typing.Optional[typing.List[int]]:
+        """The winners to announce for a claimed giveaway, see claim.
+
+        A new draw is saved before anything is announced, a giveaway drawn
+        before whose announcement failed gets its saved winners back instead
+        of a second draw. ``None`` if the claim ran out and someone else drew
+        it meanwhile.
+        """
+        if giveaway["winner_id"] is not None:
+            return [
+                row["user_id"]
+                for row in await self.db.fetch("giveaway_winners", giveaway["id"])
+            ]
+        winners = await self.draw_winners(giveaway, message)
+        drawn = await self.db.fetchval(
+            "record_draw",
+            giveaway["id"],
+            giveaway["claimed_by"],
+            ended_at,
+            winners[0] if winners else NO_WINNER,
+            duration,
+            winners,
         )
-        if not giveaway:
-            badarg = commands.BadArgument("No giveaway with this id.")
-            badarg.param = dummy()
-            badarg.param.name = "giveaway_id"
-            raise badarg
-        giveaway = giveaway[0]
-        channel = self.bot.get_channel(giveaway["channel_id"])
-        if channel is None:
-            raise commands.BadArgument(f"No channel with ID {giveaway['channel_id']}.")
-        message = await channel.fetch_message(giveaway["message_id"])
-        if message is None:
-            raise commands.BadArgument(f"No message with ID {giveaway['message_id']}.")
-        winner = [user async for user in message.reactions[0].users()]
-        winner = random.choice(winner)
-        if winner is None:
-            winner = dummy()
-            winner.mention = "No one"
-            winner.id = None
-        now = datetime.datetime.now()
-        await message.edit(
+        return winners if drawn else None
+
+    async def mark_announced(self, giveaway) -> None:
+        """Finish a giveaway once its winners are announced."""
+        await self.db.execute(
+            "announce_giveaway", giveaway["id"], giveaway["claimed_by"]
+        )
+        self.forget_giveaway(giveaway["id"])
+        await self.db.publish("giveaway_ended", id=giveaway["id"])
+
+    async def announce_winners(
+        self,
+        giveaway,
+        message: discord.Message,
+        winners: typing.List[int],
+        ended_at: datetime.datetime,
+    ) -> None:
+        """Edit the giveaway message into its final winners announcement."""
+        # the message content fits every winner, the embed gets the short form
+        mention = self.mention_winners(winners, EMBED_FIELD_LIMIT)
+        await self.outbound.edit(
+            message,
+            coalesce=False,
+            content=f"{self.mention_winners(winners)} won the giveaway!",
+            view=None,
             embed=discord.Embed(
                 title=giveaway["title"],
                 description=giveaway["description"],
                 color=discord.Color.blurple(),
             )
             .add_field(name="Prize", value=giveaway["prize"])
-            .add_field(name="Winner", value=winner.mention)
+            .add_field(name="Winner", value=mention)
             .add_field(name="ID", value=giveaway["id"])
             .add_field(
                 name="Created by",
-                value=self.bot.get_user(int(giveaway["owner_id"])).mention,
+                value=f"<@{giveaway['owner_id']}>",
             )
             .add_field(
                 name="Created at",
@@ -370,16 +936,233 @@ class Giveaways(commands.Cog):
                     "%d/%m/%Y %H:%M:%S"
                 ),
             )
-            .add_field(name="Ended at", value=now.strftime("%d/%m/%Y %H:%M:%S"))
-            .set_footer(text=f"Giveaway ended by {winner.mention}")
+            .add_field(name="Ended at", value=ended_at.strftime("%d/%m/%Y %H:%M:%S"))
+            .set_footer(text=f"Giveaway ended by {mention}"),
         )
-        await self.db.execute(
-            f"UPDATE giveaways SET ended_at = {now.timestamp()}, winner_id = {winner.id}, duration = {(now-datetime.datetime.fromtimestamp(int(giveaway['started_at']))).total_seconds()} WHERE id = {giveaway['id']}"
+
+    async def abandon_giveaway(self, giveaway, ended_at: float, reason: str) -> None:
+        """Finish a claimed giveaway without winners when it can't be announced.
+
+        Used when its channel or message is gone, otherwise it would stay
+        undrawn and be retried on every start.
+        """
+        self.log.warning(
+            f"Giveaway {giveaway['id']} ended without winners, its {reason}"
+        )
+        if giveaway["winner_id"] is None:
+            drawn = await self.db.fetchval(
+                "record_draw",
+                giveaway["id"],
+                giveaway["claimed_by"],
+                ended_at,
+                NO_WINNER,
+                None,
+                [],
+            )
+            if not drawn:
+                return
+        await self.mark_announced(giveaway)
+
+    @staticmethod
+    def mention_winners(
+        winners: typing.List[int], limit: typing.Optional[int] = None
+    ) -> str:
+        """Mention the winners, cut to ``limit`` characters with a count of the rest."""
+        if not winners:
+            return "No one"
+        mentions = [f"<@{user_id}>" for user_id in winners]
+        text = ", ".join(mentions)
+        if limit is None or len(text) <= limit:
+            return text
+        for shown in range(len(mentions) - 1, 0, -1):
+            text = f"{', '.join(mentions[:shown])} and {len(mentions) - shown} more"
+            if len(text) <= limit:
+                return text
+        return f"{len(mentions)} winners"
+
+    @contextlib.asynccontextmanager
+    async def claim(
+        self, giveaway_id: int
+    ) -> typing.AsyncIterator[typing.Optional[typing.Mapping]]:
+        """Take the lease on an undrawn giveaway before drawing it.
+
+        Yields the giveaway as it is now, or ``None`` if it is already
+        announced or someone else holds the lease. The lease is given up when the block
+        ends, or runs out after ``CLAIM_LEASE`` seconds if the process dies
+        halfway, so only one task or process ever announces the winners.
+        """
+        token = secrets.token_hex(8)
+        now = datetime.datetime.now().timestamp()
+        giveaway = await self.db.fetchrow(
+            "claim_giveaway", giveaway_id, token, now + CLAIM_LEASE, now
+        )
+        if giveaway is None:
+            yield None
+            return
+        self.drawing.add(giveaway_id)
+        try:
+            yield giveaway
+        finally:
+            self.drawing.discard(giveaway_id)
+            # nothing left to release once the draw was recorded
+            await self.db.execute("release_giveaway", giveaway_id, token)
+
+    async def finish_giveaway(self, giveaway) -> None:
+        """Claim an expired giveaway, then draw and announce it."""
+        giveaway_id = giveaway["id"]
+        async with self.claim(giveaway_id) as claimed:
+            if claimed is not None:
+                await self.draw_giveaway(claimed)
+                return
+        giveaway = await self.db.fetchrow("undrawn_giveaway", giveaway_id)
+        if giveaway is None:
+            # announced elsewhere
+            self.forget_giveaway(giveaway_id)
+        else:
+            # someone else is drawing it, take over if their lease runs out
+            self.scheduler.schedule(
+                giveaway_id,
+                giveaway["claim_expires"] or datetime.datetime.now().timestamp(),
+            )
+
+    async def draw_giveaway(self, giveaway) -> None:
+        """Draw a winner for an expired giveaway and announce it, see claim."""
+        now = datetime.datetime.now()
+        channel = self.bot.get_channel(giveaway["channel_id"])
+        if channel is None:
+            await self.abandon_giveaway(
+                giveaway, now.timestamp(), f"channel {giveaway['channel_id']} is gone"
+            )
+            return
+        try:
+            message = await channel.fetch_message(giveaway["message_id"])
+        except (discord.NotFound, discord.Forbidden) as e:
+            await self.abandon_giveaway(
+                giveaway,
+                now.timestamp(),
+                f"message {giveaway['message_id']} can't be fetched ({e.status})",
+            )
+            return
+        winners = await self.settle_winners(giveaway, message, now.timestamp())
+        if winners is None:
+            return
+        await self.announce_winners(
+            giveaway,
+            message,
+            winners,
+            datetime.datetime.fromtimestamp(giveaway["ended_at"]),
         )
+        await self.mark_announced(giveaway)
+
+    async def old_giveaway(self, cutoff: float) -> None:
+        """Finalize the giveaways of our shards that expired before ``cutoff``.
+
+        They are drawn oldest first, ``CATCH_UP_BATCH`` at a time, and the
+        key of the last one of each batch is saved as a checkpoint, so after
+        a crash catch-up continues from there instead of starting over.
+        """
+        await self.bot.wait_until_ready()
+        shards = self.local_shards()
+        scope = f"{shards[0]}:{','.join(map(str, shards[1]))}"
+        try:
+            checkpoint = await self.db.fetchrow("catch_up_checkpoint", scope)
+            key = (
+                (checkpoint["ended_at"], checkpoint["id"])
+                if checkpoint is not None
+                else (float("-inf"), 0)
+            )
+            total = await self.db.fetchval("due_giveaways_count", cutoff, *shards, *key)
+            if checkpoint is not None:
+                self.log.info(f"Resuming catch-up from giveaway {key[1]}")
+            self.log.info(f"Catching up on {total} expired giveaways")
+            done = 0
+            self.catch_up_progress = (done, total)
+            while True:
+                batch = await self.db.fetch(
+                    "due_giveaways_after", cutoff, *shards, *key, CATCH_UP_BATCH
+                )
+                if not batch:
+                    break
+                for giveaway in batch:
+                    # a reaction may have queued it on the live finalizer
+                    if giveaway["id"] not in self.finalizer:
+                        self.catch_up_pool.submit(giveaway)
+                await self.catch_up_pool.join()
+                key = (batch[-1]["ended_at"], batch[-1]["id"])
+                await self.db.execute(
+                    "upsert_catch_up_checkpoint",
+                    scope,
+                    *key,
+                    datetime.datetime.now().timestamp(),
+                )
+                done += len(batch)
+                self.catch_up_progress = (done, total)
+                self.log.info(f"Caught up on {done}/{total} expired giveaways")
+            await self.db.execute("delete_catch_up_checkpoint", scope)
+            self.log.info("Catch-up finished")
+        except Exception:
+            self.log.exception("Catch-up failed, it resumes on the next start")
+        finally:
+            self.catch_up_progress = None
+
+    @giveaway.command()
+    async def end(self, ctx: discord.Interaction, giveaway_id: str) -> None:
+        """End a giveaway."""
+        await ctx.defer()
+        giveaway = None
+        if giveaway_id.isdigit():
+            giveaway = await self.db.fetchrow("giveaway_by_id", int(giveaway_id))
+        if giveaway is None:
+            badarg = commands.BadArgument("No giveaway with this id.")
+            badarg.param = dummy()
+            badarg.param.name = "giveaway_id"
+            raise badarg
+        async with self.claim(giveaway["id"]) as claimed:
+            if claimed is None:
+                badarg = commands.BadArgument("This giveaway has already ended.")
+                badarg.param = dummy()
+                badarg.param.name = "giveaway_id"
+                raise badarg
+            giveaway = claimed
+            channel = self.bot.get_channel(giveaway["channel_id"])
+            if channel is None:
+                badarg = commands.BadArgument(
+                    f"No channel with ID {giveaway['channel_id']}."
+                )
+                badarg.param = dummy()
+                badarg.param.name = "giveaway_id"
+                raise badarg
+            message = await channel.fetch_message(giveaway["message_id"])
+            if message is None:
+                badarg = commands.BadArgument(
+                    f"No message with ID {giveaway['message_id']}."
+                )
+                badarg.param = dummy()
+                badarg.param.name = "giveaway_id"
+                raise badarg
+            now = datetime.datetime.now()
+            winners = await self.settle_winners(
+                giveaway,
+                message,
+                now.timestamp(),
+                int(
+                    (
+                        now - datetime.datetime.fromtimestamp(giveaway["started_at"])
+                    ).total_seconds()
+                ),
+            )
+            if winners is None:
+                badarg = commands.BadArgument("This giveaway has already ended.")
+                badarg.param = dummy()
+                badarg.param.name = "giveaway_id"
+                raise badarg
+            await self.announce_winners(giveaway, message, winners, now)
+            await self.mark_announced(giveaway)
+        mention = self.mention_winners(winners, EMBED_FIELD_LIMIT)
         await ctx.send(
             embed=discord.Embed(
                 title="Giveaway ended!",
-                description=f"Forcefully ended giveaway with a ID of {giveaway['id']} and the winner is {winner.mention}.",
+                description=f"Forcefully ended giveaway with a ID of {giveaway['id']} and the winner is {mention}.",
             )
         )
 
@@ -387,26 +1170,20 @@ class Giveaways(commands.Cog):
     async def list_giveaway(
         self, ctx: discord.Interaction, status: Status = "active"
     ) -> None:
-        """List giveaways."""
+        """List this server's giveaways."""
         await ctx.defer()
         if isinstance(status, Status):
             status = status.value
-        if status == "active":
-            giveaways = await self.db.fetch(
-                f"SELECT * FROM giveaways WHERE ended_at > {datetime.datetime.now().timestamp()}"
-            )
-        elif status == "ended":
-            giveaways = await self.db.fetch(
-                f"SELECT * FROM giveaways WHERE ended_at < {datetime.datetime.now().timestamp()}"
-            )
-        else:
+        if status not in ("active", "ended"):
             badarg = commands.BadArgument(
                 f"Invalid status {status}. Only available options are active and ended."
             )
             badarg.param = dummy()
             badarg.param.name = "status"
             raise badarg
-        if not giveaways:
+        source = GiveawayPageSource(self.db, ctx.guild.id, status)
+        await source.prepare()
+        if not source.total:
             await ctx.send(
                 embed=discord.Embed(
                     title="No giveaways. found with those status",
@@ -414,63 +1191,24 @@ class Giveaways(commands.Cog):
                 )
             )
             return
-        embed = discord.Embed(
-            title=f"{len(giveaways)} giveaways found with status {status}",
-            color=discord.Color.blurple(),
-        )
-        embeds = []
-        for giveaway in giveaways:
-            embed = discord.Embed(
-                title=giveaway["title"],
-                description=giveaway["description"],
-                color=discord.Color.blurple(),
-            )
-            embed.add_field(name="Prize", value=giveaway["prize"])
-            embed.add_field(name="ID", value=giveaway["id"])
-            embed.add_field(
-                name="Created by",
-                value=self.bot.get_user(giveaway["owner_id"]).mention,
-            )
-            embed.add_field(
-                name="Created at",
-                value=datetime.datetime.fromtimestamp(giveaway["started_at"]).strftime(
-                    "%d/%m/%Y %H:%M:%S"
-                ),
-            )
-            embed.add_field(
-                name="Ended at",
-                value=datetime.datetime.fromtimestamp(giveaway["ended_at"]).strftime(
-                    "%d/%m/%Y %H:%M:%S"
-                ),
-            )
-            embed.add_field(
-                name="Winner",
-                value=self.bot.get_user(giveaway["winner_id"]).mention
-                if giveaway["winner_id"]
-                else "No winner yet.",
-            )
-            embeds.append(embed)
-        await ctx.send(embed=embed)
-        if len(embeds) >= 10:  # discord limitation
-            for embed in embeds:
-                await ctx.send(embed=embed)
-                await asyncio.sleep(0.5)
-        else:
-            await ctx.send(embeds=embeds)
+        await Pages(source, ctx=ctx, compact=True).start()
 
     @giveaway.command()
     async def info(self, ctx: discord.Interaction, giveaway_id: str) -> None:
         """Get info about a giveaway."""
         await ctx.defer()
-        giveaway = await self.db.fetch(
-            f"SELECT * FROM giveaways WHERE id = '{giveaway_id}'"
-        )
-        if not giveaway:
+        giveaway = None
+        if giveaway_id.isdigit():
+            giveaway = await self.db.fetchrow("giveaway_by_id", int(giveaway_id))
+            if giveaway is None:
+                giveaway = await self.db.fetchrow(
+                    "archived_giveaway_by_id", int(giveaway_id)
+                )
+        if giveaway is None:
             badarg = commands.BadArgument(f"No giveaway with ID {giveaway_id}.")
             badarg.param = dummy()
             badarg.param.name = "giveaway_id"
             raise badarg
-        giveaway = giveaway[0]
         channel = self.bot.get_channel(giveaway["channel_id"])
         if channel is None:
             channel = dummy()
@@ -488,7 +1226,7 @@ class Giveaways(commands.Cog):
         embed.add_field(name="ID", value=giveaway["id"])
         embed.add_field(
             name="Created by",
-            value=self.bot.get_user(giveaway["owner_id"]).mention,
+            value=f"<@{giveaway['owner_id']}>",
         )
         embed.add_field(
             name="Created at",
@@ -503,7 +1241,10 @@ class Giveaways(commands.Cog):
             ),
         )
         embed.add_field(
-            name="Winner", value=self.bot.get_user(giveaway["winner_id"]).mention
+            name="Winner",
+            value=self.mention_winners(
+                await winners_of(self.db, giveaway), EMBED_FIELD_LIMIT
+            ),
         )
         embed.add_field(name="Channel", value=channel.mention)
         embed.add_field(name="Message", value=message.jump_url)
@@ -516,16 +1257,9 @@ class Giveaways(commands.Cog):
     ) -> None:
         """Setup giveaway role."""
         await ctx.defer()
-        setup_db = await EasySQL().connect(
-            host=os.environ.get("DB_HOST"),
-            database="giveaways",
-            user="giveaway_bot",
-            password=os.environ["DB_PASS"],
-        )
-        await setup_db.execute(
-            f"INSERT INTO setup(guild_id, giveaway_role_id) VALUES({ctx.guild.id}, {giveaway_role.id})"
-        )
-        await setup_db.close()
+        await self.db.execute("upsert_setup", ctx.guild.id, giveaway_role.id)
+        self.settings.invalidate(ctx.guild.id)
+        await self.db.publish("setup_changed", guild_id=ctx.guild.id)
         await ctx.send(
             embed=discord.Embed(
                 title="Setup complete",
@@ -548,14 +1282,25 @@ class Giveaways(commands.Cog):
                 "3. Prize\n"
                 "4. Channel (optional (say none or null for not answering))\n"
                 "5. Time\n"
-                "6. Condition (optional (say none or null for not answering))\n",
+                "6. Number of winners\n"
+                "7. Bonus entries like `@Booster=2` (optional (say none or null for not answering))\n"
+                "8. Condition (optional (say none or null for not answering))\n",
             )
         )
 
         def check(m: discord.Message) -> bool:
             return m.author == ctx.author and m.channel == ctx.channel
 
-        infos = ["title", "description", "prize", "channel", "time", "condition"]
+        infos = [
+            "title",
+            "description",
+            "prize",
+            "channel",
+            "time",
+            "winners",
+            "weights",
+            "condition",
+        ]
         data = {}
         for info in infos:
             await ctx.send(
@@ -568,8 +1313,15 @@ class Giveaways(commands.Cog):
             data[info] = msg.content
         if data["channel"].lower() in ("none", "null"):
             data["channel"] = None
+        if data["weights"].lower() in ("none", "null"):
+            data["weights"] = None
         if data["condition"].lower() in ("none", "null"):
             data["condition"] = None
+        if not data["winners"].isdigit():
+            badarg = commands.BadArgument("Winners must be a number.")
+            badarg.param = dummy()
+            badarg.param.name = "winners"
+            raise badarg
         await ctx.send(
             embed=discord.Embed(
                 title="Giveaway setup",
@@ -584,9 +1336,104 @@ class Giveaways(commands.Cog):
             prize=data["prize"],
             channel=data["channel"],
             time=data["time"],
+            winners=int(data["winners"]),
+            weights=data["weights"],
             condition=data["condition"],
         )
 
+    async def get_active_giveaway(self, message_id: int):
+        """Return the undrawn giveaway posted as ``message_id``, if any."""
+        if self.index.loaded:
+            return self.index.get(message_id)
+        # the index is filled on ready, until then ask the database
+        return await self.db.fetchrow("undrawn_giveaway_by_message", message_id)
+
+    async def add_entry(
+        self, giveaway, member: discord.Member
+    ) -> typing.Optional[bool]:
+        """Record an entry, ``None`` if the giveaway already expired.
+
+        Returns whether the member was added, ``False`` if they had already entered.
+        """
+        if (
+            datetime.datetime.fromtimestamp(giveaway["ended_at"])
+            <= datetime.datetime.now()
+        ):
+            self.finalize(giveaway)
+            return None
+        entrants = self.entrants.get(giveaway["id"])
+        if entrants is not None and member.id in entrants:
+            return False
+        weights = self.get_role_weights(giveaway)
+        status = await self.db.execute(
+            "insert_entry",
+            giveaway["id"],
+            member.id,
+            datetime.datetime.now().timestamp(),
+            entry_weight(weights, member) if weights else 1.0,
+        )
+        left = self.left_while_loading.get(giveaway["id"])
+        if left is not None:
+            left.discard(member.id)
+        # looked up again, load_schedule may have swapped the set meanwhile
+        entrants = self.entrants.get(giveaway["id"])
+        if entrants is not None:
+            entrants.add(member.id)
+        if not status.endswith(" 1"):
+            return False
+        self.dirty.add(giveaway["id"])
+        return True
+
+    async def remove_entry(self, giveaway, user_id: int) -> bool:
+        entrants = self.entrants.get(giveaway["id"])
+        left = self.left_while_loading.get(giveaway["id"])
+        if left is not None:
+            # they may only be in the ledger that is still streaming in
+            left.add(user_id)
+            if entrants is not None:
+                entrants.discard(user_id)
+        elif entrants is not None and not entrants.discard(user_id):
+            return False
+        status = await self.db.execute("delete_entry", giveaway["id"], user_id)
+        if not status.endswith(" 1"):
+            return False
+        self.dirty.add(giveaway["id"])
+        return True
+
+    async def enter_button(
+        self, interaction: discord.Interaction, giveaway_id: int
+    ) -> None:
+        """Enter button press, pressing it again leaves the giveaway."""
+        if self.index.loaded:
+            giveaway = self.index.get_by_id(giveaway_id)
+        else:
+            giveaway = await self.db.fetchrow("undrawn_giveaway", giveaway_id)
+        if giveaway is None:
+            await interaction.response.send_message(
+                "This giveaway has already ended.", ephemeral=True
+            )
+            return
+        condition_func = self.get_condition(giveaway)
+        if condition_func is not None and not condition_func(interaction.user):
+            await interaction.response.send_message(
+                embed=discord.Embed(
+                    title="You don't meet the conditions!",
+                    description=giveaway["conditions"],
+                    color=discord.Color.red(),
+                ),
+                ephemeral=True,
+            )
+            return
+        entered = await self.add_entry(giveaway, interaction.user)
+        if entered is None:
+            message = "This giveaway has already ended."
+        elif entered:
+            message = "You entered the giveaway, good luck!"
+        else:
+            await self.remove_entry(giveaway, interaction.user.id)
+            message = "You left the giveaway."
+        await interaction.response.send_message(message, ephemeral=True)
+
     @commands.Cog.listener()
     async def on_raw_reaction_add(
         self, payload: discord.RawReactionActionEvent
@@ -594,67 +1441,56 @@ class Giveaways(commands.Cog):
         """Reaction add event."""
         if payload.emoji.name != "🎉":
             return
-        giveaway = await self.db.fetch(
-            f"SELECT * FROM giveaways WHERE message_id = '{payload.message_id}'"
-        )
-        if not giveaway:
+        if payload.member is not None and payload.member.bot:
+            return
+        giveaway = await self.get_active_giveaway(payload.message_id)
+        if giveaway is None:
             return
-        giveaway = giveaway[0]
         if giveaway["winner_id"] is not None:
             return
-        if giveaway["conditions"] is not None:
-            condition_func = self.parse_condition(giveaway["conditions"])
-            if not condition_func(payload.member):
-                await payload.member.send(
-                    embed=discord.Embed(
-                        title="You don't meet the conditions!",
-                        description=giveaway["conditions"],
-                        color=discord.Color.red(),
+        member = payload.member
+        if member is None:
+            guild = self.bot.get_guild(payload.guild_id)
+            if guild is None:
+                return
+            member = await self.resolver.member(guild, payload.user_id)
+            if member is None or member.bot:
+                return
+        condition_func = self.get_condition(giveaway)
+        if condition_func is not None:
+            if not condition_func(member):
+                self.outbound.detach(
+                    self.outbound.dm(
+                        member,
+                        embed=discord.Embed(
+                            title="You don't meet the conditions!",
+                            description=giveaway["conditions"],
+                            color=discord.Color.red(),
+                        ),
                     )
                 )
                 channel = self.bot.get_channel(giveaway["channel_id"])
                 if channel is None:
                     return
-                message = await channel.fetch_message(giveaway["message_id"])
-                if message is None:
-                    return
-                await message.remove_reaction(payload.emoji, payload.member)
+                message = channel.get_partial_message(giveaway["message_id"])
+                self.outbound.detach(
+                    self.outbound.remove_reaction(message, payload.emoji, member)
+                )
                 return
 
-        if (
-            datetime.datetime.fromtimestamp(giveaway["ended_at"])
-            <= datetime.datetime.now()
-        ):
-            message = await self.bot.get_channel(giveaway["channel_id"]).fetch_message(
-                giveaway["message_id"]
-            )
-            if message is None:
-                return
-            winner = [member async for member in message.reactions[0].users()]
-            winner.remove(self.bot.user)
-            winner = random.choice(winner)
-            if winner is None:
-                winner = dummy()
-                winner.mention = "No one"
-            owner = await self.bot.fetch_user(giveaway["owner_id"])
-            await message.edit(
-                content=f"{winner.mention} won the giveaway!",
-                embed=discord.Embed(
-                    title=giveaway["title"],
-                    description=giveaway["description"],
-                    color=discord.Color.blurple(),
-                )
-                .add_field(name="Prize", value=giveaway["prize"])
-                .add_field(name="Winner", value=winner.mention)
-                .add_field(name="ID", value=giveaway["id"])
-                .add_field(name="Created by", value=owner.mention)
-                .add_field(name="Created at", value=giveaway["started_at"])
-                .set_footer(text=f"Giveaway ended by {message.author.name}"),
-            )
+        await self.add_entry(giveaway, member)
 
-            await self.db.execute(
-                f"UPDATE giveaways SET winner_id = '{winner.id}' WHERE id = '{giveaway['id']}'"
-            )
+    @commands.Cog.listener()
+    async def on_raw_reaction_remove(
+        self, payload: discord.RawReactionActionEvent
+    ) -> None:
+        """Reaction remove event."""
+        if payload.emoji.name != "🎉":
+            return
+        giveaway = await self.get_active_giveaway(payload.message_id)
+        if giveaway is None:
+            return
+        await self.remove_entry(giveaway, payload.user_id)
 
 
 async def setup(bot: commands.Bot) -> None:
@@ -2,7 +2,6 @@ import platform
 from datetime import datetime
 
 import discord
-import psutil
 from discord.ext import commands
 
 from . import utils
@@ -18,6 +17,41 @@ class Stuff(
     def __init__(self, bot):
         self.bot = bot
 
+    async def cog_load(self):
+        self.bot.ipc.register("status", self.worker_status)
+
+    async def cog_unload(self):
+        self.bot.ipc.unregister("status")
+
+    async def worker_status(self):
+        """This process's share of the status command."""
+        import psutil
+
+        status = {
+            "cluster": self.bot.ipc.cluster_id,
+            "shards": ",".join(map(str, sorted(self.bot.shards))),
+            "guilds": len(self.bot.guilds),
+            "latency": round(self.bot.latency * 1000),
+            "rss": psutil.Process().memory_info().rss,
+            "index": None,
+            "lookups": self.bot.resolver.stats(),
+        }
+        giveaways = self.bot.get_cog("Giveaways")
+        if giveaways is not None:
+            outbound = giveaways.outbound
+            entrants = giveaways.entrants.values()
+            status.update(
+                outbound.stats(),
+                total_wait=outbound.total_wait,
+                index=len(giveaways.index),
+                hits=giveaways.index.hits,
+                misses=giveaways.index.misses,
+                entrants=sum(map(len, entrants)),
+                entrant_bytes=sum(e.nbytes() for e in entrants),
+                catch_up=giveaways.catch_up_progress,
+            )
+        return status
+
     @property
     def display_emoji(self):
         return "💭"
@@ -65,6 +99,9 @@ class Stuff(
         """
         Status of bot like uptime, memory usage, etc.
         """
+        # imported on first use, it's only needed here
+        import psutil
+
         embed = discord.Embed(
             title="Status", description="Bot status", color=discord.Color.green()
         )
@@ -78,6 +115,58 @@ class Stuff(
         embed.add_field(name="Python", value=f"{platform.python_version()}")
         embed.add_field(name="Discord.py", value=f"{discord.__version__}")
         embed.add_field(name="Bot version", value=f"{self.bot.version_}")
+        workers = [
+            reply["result"]
+            for reply in await self.bot.ipc.broadcast("status")
+            if "result" in reply
+        ]
+
+        def total(key: str) -> float:
+            return sum(worker[key] for worker in workers)
+
+        if workers and all(worker["index"] is not None for worker in workers):
+            embed.add_field(
+                name="Giveaway index",
+                value=f"{total('index')} active, {total('hits')} hits, {total('misses')} misses",
+            )
+            embed.add_field(
+                name="Entrants",
+                value=f"{total('entrants')} tracked in "
+                f"{total('entrant_bytes') / 1024 / 1024:.2f} MiB",
+            )
+            sent = total("sent")
+            embed.add_field(
+                name="Outbound queue",
+                value=f"{total('depth')} queued in {total('buckets')} buckets, "
+                f"{sent} sent, {total('coalesced')} coalesced, "
+                f"wait avg {total('total_wait') / sent if sent else 0:.2f}s "
+                f"max {max(worker['max_wait'] for worker in workers):.2f}s",
+            )
+        catching_up = [w["catch_up"] for w in workers if w.get("catch_up")]
+        if catching_up:
+            embed.add_field(
+                name="Catch-up",
+                value=f"{sum(done for done, _ in catching_up)}/"
+                f"{sum(count for _, count in catching_up)} expired giveaways drawn",
+            )
+        if workers:
+            embed.add_field(
+                name="User lookups",
+                value=f"{sum(w['lookups']['cached'] for w in workers)} cached, "
+                f"{sum(w['lookups']['hits'] for w in workers)} hits, "
+                f"{sum(w['lookups']['fetches'] for w in workers)} fetches",
+            )
+        if len(workers) > 1:
+            embed.add_field(
+                name="Clusters",
+                value="\n".join(
+                    f"#{worker['cluster']} shards {worker['shards']}: "
+                    f"{worker['guilds']} guilds, {worker['latency']} ms, "
+                    f"{worker['rss'] / 1024 / 1024:.0f} MiB"
+                    for worker in workers
+                ),
+                inline=False,
+            )
         await ctx.send(embed=embed)
 
 
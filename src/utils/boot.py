@@ -0,0 +1,39 @@
+import contextlib
+import time
+import typing
+
+
+class BootTimer:
+    """
+    Wall time of each startup phase, for the report logged once the bot is
+    ready. Phases may run concurrently, so they can add up to more than the
+    total.
+    """
+
+    def __init__(self, started: typing.Optional[float] = None) -> None:
+        self.started = time.perf_counter() if started is None else started
+        self.phases: typing.Dict[str, float] = {}
+        self._running: typing.Dict[str, float] = {}
+        self.reported = False
+
+    def start(self, name: str) -> None:
+        self._running[name] = time.perf_counter()
+
+    def stop(self, name: str) -> None:
+        self.phases[name] = time.perf_counter() - self._running.pop(name)
+
+    @contextlib.contextmanager
+    def phase(self, name: str) -> typing.Iterator[None]:
+        self.start(name)
+        try:
+            yield
+        finally:
+            self.stop(name)
+
+    def report(self) -> str:
+        self.reported = True
+        total = time.perf_counter() - self.started
+        phases = ", ".join(
+            f"{name} {seconds:.2f}s" for name, seconds in self.phases.items()
+        )
+        return f"{phases}, total {total:.2f}s"
@@ -0,0 +1,55 @@
+import collections
+import time
+import typing
+
+K = typing.TypeVar("K")
+V = typing.TypeVar("V")
+
+_missing = object()
+
+
+class TTLCache(typing.Generic[K, V]):
+    """
+    Dict-like cache whose entries expire ``ttl`` seconds after being set.
+
+    With ``maxsize`` the least recently used entry is evicted once full.
+    ``None`` is a valid cached value, use ``get(key, default)`` with a
+    sentinel to tell a cached ``None`` from a miss.
+    """
+
+    def __init__(self, ttl: float, maxsize: typing.Optional[int] = None) -> None:
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._data: "collections.OrderedDict[K, typing.Tuple[float, V]]" = (
+            collections.OrderedDict()
+        )
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: K) -> bool:
+        return self.get(key, _missing) is not _missing
+
+    def get(self, key: K, default: typing.Any = None) -> typing.Any:
+        entry = self._data.get(key)
+        if entry is None:
+            return default
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            return default
+        self._data.move_to_end(key)
+        return value
+
+    def __setitem__(self, key: K, value: V) -> None:
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        if self.maxsize is not None:
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def invalidate(self, key: K) -> None:
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        self._data.clear()
@@ -0,0 +1,271 @@
+"""
+Giveaway entry conditions.
+
+A condition is a small boolean expression compiled once into a tree of
+predicate objects, e.g.::
+
+    role 123 and (account age 30 or join age 7)
+    not role @Muted
+    everyone
+
+``role`` accepts role ids or mentions (comma separated means any of them),
+``account age`` and ``join age`` take a number of days.
+"""
+
+import datetime
+import re
+import typing
+
+import discord
+
+__all__ = (
+    "ConditionError",
+    "Condition",
+    "Everyone",
+    "Role",
+    "AccountAge",
+    "JoinAge",
+    "Not",
+    "And",
+    "Or",
+    "compile_condition",
+    "parse_role_weights",
+    "entry_weight",
+)
+
+
+class ConditionError(ValueError):
+    pass
+
+
+class Condition:
+    def __call__(self, member: discord.Member) -> bool:
+        raise NotImplementedError
+
+
+class Everyone(Condition):
+    def __call__(self, member: discord.Member) -> bool:
+        return True
+
+    def __repr__(self) -> str:
+        return "everyone"
+
+
+class Role(Condition):
+    def __init__(self, role_ids: typing.Iterable[int]) -> None:
+        self.role_ids = frozenset(role_ids)
+
+    def __call__(self, member: discord.Member) -> bool:
+        # Member.get_role bisects the member's sorted role id array, so no
+        # per-check list of roles is built.
+        return any(member.get_role(role_id) is not None for role_id in self.role_ids)
+
+    def __repr__(self) -> str:
+        return f"role {','.join(map(str, sorted(self.role_ids)))}"
+
+
+class AccountAge(Condition):
+    def __init__(self, days: int) -> None:
+        self.age = datetime.timedelta(days=days)
+
+    def __call__(self, member: discord.Member) -> bool:
+        return discord.utils.utcnow() - member.created_at >= self.age
+
+    def __repr__(self) -> str:
+        return f"account age {self.age.days}"
+
+
+class JoinAge(Condition):
+    def __init__(self, days: int) -> None:
+        self.age = datetime.timedelta(days=days)
+
+    def __call__(self, member: discord.Member) -> bool:
+        joined_at = getattr(member, "joined_at", None)
+        if joined_at is None:
+            return False
+        return discord.utils.utcnow() - joined_at >= self.age
+
+    def __repr__(self) -> str:
+        return f"join age {self.age.days}"
+
+
+class Not(Condition):
+    def __init__(self, condition: Condition) -> None:
+        self.condition = condition
+
+    def __call__(self, member: discord.Member) -> bool:
+        return not self.condition(member)
+
+    def __repr__(self) -> str:
+        return f"not {self.condition!r}"
+
+
+class And(Condition):
+    def __init__(self, conditions: typing.Sequence[Condition]) -> None:
+        self.conditions = tuple(conditions)
+
+    def __call__(self, member: discord.Member) -> bool:
+        return all(condition(member) for condition in self.conditions)
+
+    def __repr__(self) -> str:
+        return "(" + " and ".join(map(repr, self.conditions)) + ")"
+
+
+class Or(Condition):
+    def __init__(self, conditions: typing.Sequence[Condition]) -> None:
+        self.conditions = tuple(conditions)
+
+    def __call__(self, member: discord.Member) -> bool:
+        return any(condition(member) for condition in self.conditions)
+
+    def __repr__(self) -> str:
+        return "(" + " or ".join(map(repr, self.conditions)) + ")"
+
+
+_token = re.compile(r"\s*(\(|\)|[^\s()]+)")
+_role_mention = re.compile(r"<@&([0-9]+)>")
+
+
+def _tokenize(text: str) -> typing.List[str]:
+    tokens = []
+    position = 0
+    text = text.strip()
+    while position < len(text):
+        match = _token.match(text, position)
+        if match is None:
+            raise ConditionError(f"Unexpected character at {position}.")
+        tokens.append(match.group(1))
+        position = match.end()
+    return tokens
+
+
+class _Parser:
+    def __init__(self, text: str) -> None:
+        self.tokens = _tokenize(text)
+        self.position = 0
+
+    def peek(self) -> typing.Optional[str]:
+        if self.position < len(self.tokens):
+            return self.tokens[self.position].lower()
+        return None
+
+    def take(self) -> str:
+        if self.position >= len(self.tokens):
+            raise ConditionError("Unexpected end of condition.")
+        token = self.tokens[self.position]
+        self.position += 1
+        return token
+
+    def expect(self, word: str) -> None:
+        token = self.take()
+        if token.lower() != word:
+            raise ConditionError(f"Expected `{word}` but got `{token}`.")
+
+    def parse(self) -> Condition:
+        condition = self.parse_or()
+        if self.peek() is not None:
+            raise ConditionError(f"Unexpected `{self.take()}`.")
+        return condition
+
+    def parse_or(self) -> Condition:
+        conditions = [self.parse_and()]
+        while self.peek() == "or":
+            self.take()
+            conditions.append(self.parse_and())
+        return conditions[0] if len(conditions) == 1 else Or(conditions)
+
+    def parse_and(self) -> Condition:
+        conditions = [self.parse_not()]
+        while self.peek() == "and":
+            self.take()
+            conditions.append(self.parse_not())
+        return conditions[0] if len(conditions) == 1 else And(conditions)
+
+    def parse_not(self) -> Condition:
+        if self.peek() == "not":
+            self.take()
+            return Not(self.parse_not())
+        if self.peek() == "(":
+            self.take()
+            condition = self.parse_or()
+            self.expect(")")
+            return condition
+        return self.parse_atom()
+
+    def parse_days(self) -> int:
+        token = self.take()
+        if not token.isdigit():
+            raise ConditionError(f"`{token}` is not a number of days.")
+        return int(token)
+
+    def parse_role_ids(self) -> typing.List[int]:
+        role_ids = []
+        for part in self.take().split(","):
+            match = _role_mention.fullmatch(part)
+            if match is not None:
+                part = match.group(1)
+            if not part.isdigit():
+                raise ConditionError(f"`{part}` is not a role id or role mention.")
+            role_ids.append(int(part))
+        return role_ids
+
+    def parse_atom(self) -> Condition:
+        word = self.take().lower()
+        if word == "everyone":
+            return Everyone()
+        elif word == "role":
+            return Role(self.parse_role_ids())
+        elif word == "account":
+            self.expect("age")
+            return AccountAge(self.parse_days())
+        elif word == "join":
+            self.expect("age")
+            return JoinAge(self.parse_days())
+        raise ConditionError(f"`{word}` is not a valid condition.")
+
+
+def compile_condition(text: str) -> Condition:
+    """Compile a condition string into a predicate, raises ConditionError."""
+    if not text or not text.strip():
+        raise ConditionError("Condition is empty.")
+    return _Parser(text).parse()
+
+
+def parse_role_weights(text: str) -> typing.Dict[int, float]:
+    """
+    Parse bonus entry multipliers like ``<@&123>=2, 456=1.5``.
+
+    Raises ConditionError on malformed input.
+    """
+    weights: typing.Dict[int, float] = {}
+    for part in text.replace(" ", "").split(","):
+        if not part:
+            continue
+        role, sep, weight = part.partition("=")
+        match = _role_mention.fullmatch(role)
+        if match is not None:
+            role = match.group(1)
+        if not sep or not role.isdigit():
+            raise ConditionError(f"`{part}` is not a `role=multiplier` pair.")
+        try:
+            multiplier = float(weight)
+        except ValueError:
+            raise ConditionError(f"`{weight}` is not a number.") from None
+        if not 0 < multiplier <= 100:
+            raise ConditionError("Multipliers must be above 0 and at most 100.")
+        weights[int(role)] = multiplier
+    if not weights:
+        raise ConditionError("No role multipliers given.")
+    return weights
+
+
+def entry_weight(weights: typing.Mapping[int, float], member: discord.Member) -> float:
+    """Highest multiplier among the member's roles, 1 when none match."""
+    return max(
+        (
+            weight
+            for role_id, weight in weights.items()
+            if member.get_role(role_id) is not None
+        ),
+        default=1.0,
+    )
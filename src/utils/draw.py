@@ -0,0 +1,153 @@
+import array
+import itertools
+import math
+import random
+import typing
+
+T = typing.TypeVar("T")
+
+
+def _uniform(rng: random.Random) -> float:
+    """Uniform float in the open interval (0, 1)."""
+    u = rng.random()
+    while u == 0.0:
+        u = rng.random()
+    return u
+
+
+def _gap(rng: random.Random, weight: float) -> int:
+    """Number of entrants to jump over before the next replacement."""
+    if weight >= 1.0:
+        return 0
+    return math.floor(math.log(_uniform(rng)) / math.log1p(-weight))
+
+
+async def reservoir_sample(
+    entrants: typing.AsyncIterable[T],
+    k: int = 1,
+    *,
+    skip: typing.Optional[typing.Callable[[T], bool]] = None,
+    rng: typing.Optional[random.Random] = None,
+) -> typing.List[T]:
+    """
+    Pick ``k`` distinct entrants uniformly at random in one pass.
+
+    Works on any async iterator (reaction pager, database cursor, ...) and
+    only ever holds ``k`` entrants in memory. Uses Li's "Algorithm L", which
+    jumps over entrants in geometrically sized gaps so the number of random
+    numbers drawn is O(k log(n / k)) instead of one per entrant.
+
+    Entrants for which ``skip`` returns True (bots) are not counted. Returns
+    fewer than ``k`` entrants, possibly none, when the pool is too small.
+    """
+    if k <= 0:
+        return []
+    rng = rng or random.Random()
+    reservoir: typing.List[T] = []
+    weight = 0.0
+    seen = 0
+    next_pick = 0
+    async for entrant in entrants:
+        if skip is not None and skip(entrant):
+            continue
+        if seen < k:
+            reservoir.append(entrant)
+            seen += 1
+            if seen == k:
+                weight = math.exp(math.log(_uniform(rng)) / k)
+                next_pick = seen + _gap(rng, weight)
+            continue
+        if seen == next_pick:
+            reservoir[rng.randrange(k)] = entrant
+            weight *= math.exp(math.log(_uniform(rng)) / k)
+            next_pick += 1 + _gap(rng, weight)
+        seen += 1
+    # the first k entrants fill the reservoir in arrival order
+    rng.shuffle(reservoir)
+    return reservoir
+
+
+class AliasTable:
+    """
+    Walker/Vose alias table: O(n) to build, O(1) per weighted draw.
+
+    Probabilities and aliases live in flat arrays, 16 bytes per entrant.
+    """
+
+    def __init__(self, weights: typing.Sequence[float]) -> None:
+        n = len(weights)
+        if n == 0:
+            raise ValueError("Cannot build an alias table without weights.")
+        total = math.fsum(weights)
+        if total <= 0:
+            raise ValueError("Weights must add up to more than zero.")
+        self.size = n
+        self.probability = array.array("d", (weight * n / total for weight in weights))
+        self.alias = array.array("q", range(n))
+        small = array.array("q")
+        large = array.array("q")
+        for i, scaled in enumerate(self.probability):
+            (small if scaled < 1.0 else large).append(i)
+        probability = self.probability
+        while small and large:
+            less = small.pop()
+            more = large.pop()
+            self.alias[less] = more
+            probability[more] = (probability[more] + probability[less]) - 1.0
+            if probability[more] < 1.0:
+                small.append(more)
+            else:
+                large.append(more)
+        # leftovers are only off by rounding errors
+        for i in itertools.chain(small, large):
+            probability[i] = 1.0
+
+    def sample(self, rng: random.Random) -> int:
+        column = rng.randrange(self.size)
+        if rng.random() < self.probability[column]:
+            return column
+        return self.alias[column]
+
+
+def weighted_sample(
+    weights: typing.Sequence[float],
+    k: int = 1,
+    *,
+    rng: typing.Optional[random.Random] = None,
+) -> typing.List[int]:
+    """
+    Draw ``k`` distinct indices, each round weighted by ``weights``.
+
+    Repeated indices are rejected and redrawn from the same alias table. Once
+    half of the table's weight has been drawn it is rebuilt over the
+    remaining indices, so the expected number of draws per winner stays
+    below two.
+    """
+    rng = rng or random.Random()
+    k = min(k, sum(1 for weight in weights if weight > 0))
+    picked: typing.List[int] = []
+    chosen: typing.Set[int] = set()
+    # None maps table columns straight to indices, until the first rebuild
+    columns: typing.Optional[array.array] = None
+    table_weights = weights
+    while len(picked) < k:
+        table = AliasTable(table_weights)
+        budget = math.fsum(table_weights) / 2
+        drawn = 0.0
+        while len(picked) < k and drawn < budget:
+            index = table.sample(rng)
+            if columns is not None:
+                index = columns[index]
+            if index in chosen or weights[index] <= 0:
+                continue
+            chosen.add(index)
+            picked.append(index)
+            drawn += weights[index]
+        if len(picked) == k:
+            break
+        columns = array.array(
+            "q",
+            (i for i in range(len(weights)) if weights[i] > 0 and i not in chosen),
+        )
+        table_weights = array.array("d", (weights[i] for i in columns))
+    return picked
@@ -0,0 +1,95 @@
+import array
+import bisect
+import typing
+
+
+class EntrantSet:
+    """
+    Set of user ids stored as a sorted ``array('Q')``, 8 bytes per entrant.
+
+    A plain ``set`` of ints costs around 60 bytes per member. Here new ids
+    go into a small unsorted buffer first, which is merged into the sorted
+    array once it outgrows a sixteenth of it, so the merge, a linear copy,
+    is spread thin over many adds while the buffer adds at most a few bytes
+    per entrant. Membership is a binary search plus a buffer lookup.
+    Removal shifts the array in place, reactions are removed rarely enough
+    for that not to matter. See ``benchmarks/entrants.py``.
+    """
+
+    __slots__ = ("_sorted", "_buffer", "min_buffer")
+
+    def __init__(
+        self, user_ids: typing.Iterable[int] = (), *, min_buffer: int = 256
+    ) -> None:
+        self._sorted = array.array("Q", sorted(set(user_ids)))
+        self._buffer: typing.Set[int] = set()
+        self.min_buffer = min_buffer
+
+    @classmethod
+    def from_sorted(cls, user_ids: typing.Iterable[int]) -> "EntrantSet":
+        """Build from ids already sorted and unique, like an ``ORDER BY`` query."""
+        entrants = cls()
+        entrants._sorted.extend(user_ids)
+        return entrants
+
+    def __len__(self) -> int:
+        return len(self._sorted) + len(self._buffer)
+
+    def _index(self, user_id: int) -> int:
+        i = bisect.bisect_left(self._sorted, user_id)
+        if i < len(self._sorted) and self._sorted[i] == user_id:
+            return i
+        return -1
+
+    def __contains__(self, user_id: int) -> bool:
+        return user_id in self._buffer or self._index(user_id) >= 0
+
+    def add(self, user_id: int) -> bool:
+        """Add an entrant, returns False if they were already in."""
+        if user_id in self:
+            return False
+        self._buffer.add(user_id)
+        if len(self._buffer) > max(self.min_buffer, len(self._sorted) >> 4):
+            self._merge()
+        return True
+
+    def discard(self, user_id: int) -> bool:
+        """Remove an entrant, returns False if they weren't in."""
+        if user_id in self._buffer:
+            self._buffer.remove(user_id)
+            return True
+        i = self._index(user_id)
+        if i < 0:
+            return False
+        del self._sorted[i]
+        return True
+
+    def _merge(self) -> None:
+        # copy the runs between buffered ids as array slices, the existing
+        # entrants are moved with memcpy instead of one int object each
+        merged = array.array("Q")
+        start = 0
+        for user_id in sorted(self._buffer):
+            end = bisect.bisect_left(self._sorted, user_id, start)
+            merged.extend(self._sorted[start:end])
+            merged.append(user_id)
+            start = end
+        merged.extend(self._sorted[start:])
+        self._sorted = merged
+        self._buffer.clear()
+
+    def snapshot(self) -> array.array:
+        """Sorted copy of every entrant, later changes don't affect it."""
+        if self._buffer:
+            self._merge()
+        return self._sorted[:]
+
+    def __iter__(self) -> typing.Iterator[int]:
+        return iter(self.snapshot())
+
+    def nbytes(self) -> int:
+        """Rough memory held, for the status command and benchmarks."""
+        return (
+            self._sorted.buffer_info()[1] * self._sorted.itemsize
+            + len(self._buffer) * 64
+        )
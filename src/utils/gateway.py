@@ -0,0 +1,82 @@
+import logging
+import os
+import typing
+
+import discord
+
+log = logging.getLogger("GiveawayBot.Gateway")
+
+# what the giveaway features need: guilds, prefix commands and the wizard
+# (messages and their content) and 🎉 entries (reactions). Conditions read
+# roles and join dates from the member sent along with each event, so no
+# member list is kept or chunked.
+LEAN_INTENTS = ("guilds", "guild_messages", "guild_reactions", "message_content")
+
+
+def _flags(cls, value: str):
+    value = value.strip().lower()
+    if value == "all":
+        return cls.all()
+    if value == "none":
+        return cls.none()
+    flags = cls.none()
+    for name in filter(None, (name.strip() for name in value.split(","))):
+        if name not in cls.VALID_FLAGS:
+            raise ValueError(f"Unknown {cls.__name__} flag {name!r}")
+        setattr(flags, name, True)
+    return flags
+
+
+def client_options(
+    env: typing.Mapping[str, str] = os.environ
+) -> typing.Dict[str, typing.Any]:
+    """Intents and cache settings for the bot.
+
+    ``CACHE_PROFILE`` picks the defaults, ``lean`` (the default) or ``full``
+    (every intent and cache, how the bot used to run). ``INTENTS`` and
+    ``MEMBER_CACHE`` take ``all``, ``none`` or comma separated flag names,
+    ``CHUNK_GUILDS`` is ``0`` or ``1`` and ``MAX_MESSAGES`` a number, ``0``
+    turns the message cache off. Each one overrides its profile default.
+    """
+    profile = env.get("CACHE_PROFILE", "lean").lower()
+    if profile == "full":
+        intents = discord.Intents.all()
+        member_cache = discord.MemberCacheFlags.from_intents(intents)
+        chunk, max_messages = True, 1000
+    elif profile == "lean":
+        intents = _flags(discord.Intents, ",".join(LEAN_INTENTS))
+        member_cache = discord.MemberCacheFlags.none()
+        chunk, max_messages = False, None
+    else:
+        raise ValueError(f"Unknown CACHE_PROFILE {profile!r}")
+    if "INTENTS" in env:
+        intents = _flags(discord.Intents, env["INTENTS"])
+    if "MEMBER_CACHE" in env:
+        member_cache = _flags(discord.MemberCacheFlags, env["MEMBER_CACHE"])
+    if "CHUNK_GUILDS" in env:
+        chunk = env["CHUNK_GUILDS"] == "1"
+    if "MAX_MESSAGES" in env:
+        max_messages = int(env["MAX_MESSAGES"]) or None
+    if not intents.members:
+        # member updates never arrive, so cached members would go stale
+        member_cache.joined = False
+        chunk = False
+    return {
+        "intents": intents,
+        "member_cache_flags": member_cache,
+        "chunk_guilds_at_startup": chunk,
+        "max_messages": max_messages,
+    }
+
+
+def memory_report(bot: discord.Client) -> str:
+    """One line on what the caches hold, to compare cache profiles."""
+    import psutil
+
+    rss = psutil.Process().memory_info().rss
+    members = sum(len(guild.members) for guild in bot.guilds)
+    return (
+        f"RSS {rss / 1024 / 1024:.1f} MiB, {len(bot.guilds)} guilds, "
+        f"{members} members, {len(bot.users)} users, "
+        f"{len(bot.cached_messages)} messages cached"
+    )
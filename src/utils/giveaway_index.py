@@ -0,0 +1,54 @@
+import typing
+
+
+class GiveawayIndex:
+    """
+    In-process ``message_id -> giveaway row`` map of every undrawn giveaway.
+
+    Reaction events look up here before touching the database, most of them
+    are not on a giveaway message at all.
+    """
+
+    def __init__(self) -> None:
+        self._by_message: typing.Dict[int, typing.Mapping] = {}
+        self._message_ids: typing.Dict[int, int] = {}
+        self.loaded = False
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._by_message)
+
+    def __contains__(self, message_id: int) -> bool:
+        return message_id in self._by_message
+
+    def load(self, giveaways: typing.Iterable[typing.Mapping]) -> None:
+        self._by_message.clear()
+        self._message_ids.clear()
+        for giveaway in giveaways:
+            self.add(giveaway)
+        self.loaded = True
+
+    def add(self, giveaway: typing.Mapping) -> None:
+        self._by_message[giveaway["message_id"]] = giveaway
+        self._message_ids[giveaway["id"]] = giveaway["message_id"]
+
+    def remove(self, giveaway_id: int) -> None:
+        message_id = self._message_ids.pop(int(giveaway_id), None)
+        if message_id is not None:
+            self._by_message.pop(message_id, None)
+
+    def get(self, message_id: int) -> typing.Optional[typing.Mapping]:
+        """Return the cached giveaway for a message, counting hits and misses."""
+        giveaway = self._by_message.get(message_id)
+        if giveaway is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return giveaway
+
+    def get_by_id(self, giveaway_id: int) -> typing.Optional[typing.Mapping]:
+        message_id = self._message_ids.get(int(giveaway_id))
+        if message_id is None:
+            return None
+        return self._by_message.get(message_id)
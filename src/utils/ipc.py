@@ -0,0 +1,107 @@
+import asyncio
+import itertools
+import json
+import logging
+import typing
+
+log = logging.getLogger("GiveawayBot.IPC")
+
+Handler = typing.Callable[..., typing.Awaitable[typing.Any]]
+
+
+def encode(message: typing.Mapping) -> bytes:
+    """Messages are JSON objects, one per line."""
+    return json.dumps(message).encode() + b"\n"
+
+
+class IPCClient:
+    """
+    Worker side of the cluster channel, the supervisor end is in cluster.py.
+
+    Cogs register handlers by name, ``broadcast`` runs one on every worker
+    and returns a reply per worker: ``{"cluster": id, "result": ...}`` or
+    ``{"cluster": id, "error": "..."}``. Without a cluster (``path`` is None)
+    a broadcast only reaches this process, so callers don't have to care
+    how the bot is deployed.
+    """
+
+    def __init__(
+        self, path: typing.Optional[str], cluster_id: int = 0, *, timeout: float = 10
+    ) -> None:
+        self.path = path
+        self.cluster_id = cluster_id
+        self.timeout = timeout
+        self.handlers: typing.Dict[str, Handler] = {}
+        self._writer: typing.Optional[asyncio.StreamWriter] = None
+        self._reader: typing.Optional[asyncio.Task] = None
+        self._pending: typing.Dict[int, asyncio.Future] = {}
+        self._ids = itertools.count()
+        # the loop only keeps weak references to tasks
+        self._tasks: typing.Set[asyncio.Task] = set()
+
+    def register(self, name: str, handler: Handler) -> None:
+        self.handlers[name] = handler
+
+    def unregister(self, name: str) -> None:
+        self.handlers.pop(name, None)
+
+    async def connect(self) -> None:
+        if self.path is None:
+            return
+        reader, self._writer = await asyncio.open_unix_connection(self.path)
+        self._send({"op": "hello", "cluster": self.cluster_id})
+        self._reader = asyncio.create_task(self._read(reader))
+        log.info(f"Cluster {self.cluster_id} connected to the supervisor")
+
+    def _send(self, message: typing.Mapping) -> None:
+        self._writer.write(encode(message))
+
+    async def _read(self, reader: asyncio.StreamReader) -> None:
+        async for line in reader:
+            message = json.loads(line)
+            if message["op"] == "call":
+                task = asyncio.create_task(self._answer(message))
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+            elif message["op"] == "results":
+                future = self._pending.pop(message["id"], None)
+                if future is not None and not future.done():
+                    future.set_result(message["results"])
+        log.warning("Lost the connection to the cluster supervisor")
+        self._writer = None
+
+    async def _call(self, command: str, args: typing.Mapping) -> typing.Dict:
+        handler = self.handlers.get(command)
+        if handler is None:
+            return {"cluster": self.cluster_id, "error": f"Unknown command {command}"}
+        try:
+            return {"cluster": self.cluster_id, "result": await handler(**args)}
+        except Exception as e:
+            log.exception(f"IPC command {command} failed")
+            return {"cluster": self.cluster_id, "error": f"{type(e).__name__}: {e}"}
+
+    async def _answer(self, message: typing.Mapping) -> None:
+        reply = await self._call(message["command"], message["args"])
+        reply.update(op="reply", id=message["id"])
+        if self._writer is not None:
+            self._send(reply)
+
+    async def broadcast(self, command: str, **args) -> typing.List[typing.Dict]:
+        """Run ``command`` on every worker, replies are ordered by cluster id."""
+        if self._writer is None:
+            return [await self._call(command, args)]
+        id = next(self._ids)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[id] = future
+        self._send({"op": "broadcast", "id": id, "command": command, "args": args})
+        try:
+            return await asyncio.wait_for(future, self.timeout)
+        finally:
+            self._pending.pop(id, None)
+
+    async def close(self) -> None:
+        if self._reader is not None:
+            self._reader.cancel()
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
@@ -0,0 +1,181 @@
+import asyncio
+import collections
+import logging
+import time
+import typing
+
+import discord
+
+log = logging.getLogger("GiveawayBot.Outbound")
+
+Bucket = typing.Hashable
+Factory = typing.Callable[[], typing.Awaitable[typing.Any]]
+
+
+class _Action:
+    __slots__ = ("factory", "futures", "queued_at", "key")
+
+    def __init__(self, factory: Factory, key: typing.Optional[typing.Hashable]) -> None:
+        self.factory = factory
+        self.futures: typing.List[asyncio.Future] = []
+        self.queued_at = time.monotonic()
+        self.key = key
+
+
+class _BucketQueue:
+    def __init__(self) -> None:
+        self.pending: typing.Deque[_Action] = collections.deque()
+        self.by_key: typing.Dict[typing.Hashable, _Action] = {}
+        self.worker: typing.Optional[asyncio.Task] = None
+
+
+class OutboundQueue:
+    """
+    Outbound Discord REST calls, one worker per rate limit bucket.
+
+    Buckets follow Discord's major parameters (the channel for message and
+    reaction routes, the user for DMs), so a burst in one channel never
+    waits behind another. Callers get a future back instead of blocking on
+    the request. Actions queued with the same ``key`` (edits of one message)
+    collapse into the most recent one while they wait.
+    """
+
+    def __init__(self) -> None:
+        self._buckets: typing.Dict[Bucket, _BucketQueue] = {}
+        self.sent = 0
+        self.coalesced = 0
+        self.failed = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    @property
+    def depth(self) -> int:
+        return sum(len(bucket.pending) for bucket in self._buckets.values())
+
+    def stats(self) -> typing.Dict[str, typing.Any]:
+        return {
+            "depth": self.depth,
+            "buckets": len(self._buckets),
+            "sent": self.sent,
+            "coalesced": self.coalesced,
+            "failed": self.failed,
+            "avg_wait": self.total_wait / self.sent if self.sent else 0.0,
+            "max_wait": self.max_wait,
+        }
+
+    def push(
+        self,
+        bucket: Bucket,
+        factory: Factory,
+        *,
+        key: typing.Optional[typing.Hashable] = None,
+    ) -> asyncio.Future:
+        """Queue ``factory()`` on ``bucket`` and return a future for its result."""
+        queue = self._buckets.get(bucket)
+        if queue is None:
+            queue = self._buckets[bucket] = _BucketQueue()
+        future = asyncio.get_running_loop().create_future()
+        action = queue.by_key.get(key) if key is not None else None
+        if action is not None:
+            # still waiting, only the latest version has to be sent
+            action.factory = factory
+            self.coalesced += 1
+        else:
+            action = _Action(factory, key)
+            queue.pending.append(action)
+            if key is not None:
+                queue.by_key[key] = action
+        action.futures.append(future)
+        if queue.worker is None:
+            queue.worker = asyncio.create_task(self._work(bucket, queue))
+        return future
+
+    def detach(self, future: asyncio.Future) -> None:
+        """For callers that don't wait on the result, failures get logged."""
+        future.add_done_callback(self._log_failure)
+
+    @staticmethod
+    def _log_failure(future: asyncio.Future) -> None:
+        if not future.cancelled() and future.exception() is not None:
+            error = future.exception()
+            log.error("Outbound action failed", exc_info=(type(error), error, None))
+
+    @staticmethod
+    def _abandon(action: _Action) -> None:
+        for future in action.futures:
+            future.cancel()
+
+    async def _work(self, bucket: Bucket, queue: _BucketQueue) -> None:
+        try:
+            while queue.pending:
+                action = queue.pending.popleft()
+                if action.key is not None:
+                    del queue.by_key[action.key]
+                wait = time.monotonic() - action.queued_at
+                self.total_wait += wait
+                self.max_wait = max(self.max_wait, wait)
+                self.sent += 1
+                try:
+                    result = await action.factory()
+                except asyncio.CancelledError:
+                    # closed, nobody must be left waiting on a future
+                    self._abandon(action)
+                    for action in queue.pending:
+                        self._abandon(action)
+                    queue.pending.clear()
+                    queue.by_key.clear()
+                    raise
+                except Exception as e:
+                    self.failed += 1
+                    for future in action.futures:
+                        if not future.done():
+                            future.set_exception(e)
+                else:
+                    for future in action.futures:
+                        if not future.done():
+                            future.set_result(result)
+        finally:
+            queue.worker = None
+            if not queue.pending and self._buckets.get(bucket) is queue:
+                del self._buckets[bucket]
+
+    def close(self) -> None:
+        """Cancel everything queued, callers waiting on it get CancelledError."""
+        for queue in self._buckets.values():
+            if queue.worker is not None:
+                queue.worker.cancel()
+            # a worker cancelled before it started never gets to these
+            for action in queue.pending:
+                self._abandon(action)
+        self._buckets.clear()
+
+    # helpers for the calls the giveaway cog makes
+
+    def send(self, channel: discord.abc.Messageable, **kwargs) -> asyncio.Future:
+        return self.push(("channel", channel.id), lambda: channel.send(**kwargs))
+
+    def edit(
+        self, message: discord.abc.Snowflake, *, coalesce: bool = True, **kwargs
+    ) -> asyncio.Future:
+        """Edit a message, ``coalesce=False`` for an edit that must not be replaced."""
+        return self.push(
+            ("channel", message.channel.id),
+            lambda: message.edit(**kwargs),
+            key=("edit", message.id) if coalesce else None,
+        )
+
+    def add_reaction(self, message: discord.Message, emoji) -> asyncio.Future:
+        return self.push(
+            ("reactions", message.channel.id), lambda: message.add_reaction(emoji)
+        )
+
+    def remove_reaction(
+        self, message: discord.PartialMessage, emoji, member: discord.abc.Snowflake
+    ) -> asyncio.Future:
+        return self.push(
+            ("reactions", message.channel.id),
+            lambda: message.remove_reaction(emoji, member),
+        )
+
+    def dm(self, user: discord.abc.User, **kwargs) -> asyncio.Future:
+        return self.push(("dm", user.id), lambda: user.send(**kwargs))
@@ -0,0 +1,106 @@
+import asyncio
+import typing
+
+import discord
+
+from .cache import TTLCache
+
+_missing = object()
+
+
+def _retrieve(task: asyncio.Task) -> None:
+    # a lookup nobody waits on anymore mustn't log an unretrieved exception
+    if not task.cancelled():
+        task.exception()
+
+
+class Resolver:
+    """
+    Looks up users and members on demand.
+
+    The client cache is tried first, then an LRU cache of earlier fetches,
+    then the API. Concurrent lookups of the same id share one request, and
+    ids that don't exist are cached as ``None`` so they aren't fetched over
+    and over. Lets the bot run without member caching or chunking.
+    """
+
+    def __init__(
+        self, client: discord.Client, *, maxsize: int = 10000, ttl: float = 600
+    ) -> None:
+        self.client = client
+        self._cache: TTLCache[typing.Hashable, typing.Any] = TTLCache(
+            ttl=ttl, maxsize=maxsize
+        )
+        self._inflight: typing.Dict[typing.Hashable, asyncio.Task] = {}
+        self.hits = 0
+        self.fetches = 0
+
+    def stats(self) -> typing.Dict[str, int]:
+        return {
+            "cached": len(self._cache),
+            "inflight": len(self._inflight),
+            "hits": self.hits,
+            "fetches": self.fetches,
+        }
+
+    async def _resolve(
+        self,
+        key: typing.Hashable,
+        fetch: typing.Callable[[], typing.Awaitable[typing.Any]],
+    ) -> typing.Any:
+        value = self._cache.get(key, _missing)
+        if value is not _missing:
+            self.hits += 1
+            return value
+        task = self._inflight.get(key)
+        if task is None:
+            self.fetches += 1
+            # its own task, a caller that gets cancelled doesn't cancel the
+            # lookup for everyone else waiting on it
+            task = self._inflight[key] = asyncio.create_task(self._fetch(key, fetch))
+            task.add_done_callback(_retrieve)
+        else:
+            self.hits += 1
+        return await asyncio.shield(task)
+
+    async def _fetch(
+        self,
+        key: typing.Hashable,
+        fetch: typing.Callable[[], typing.Awaitable[typing.Any]],
+    ) -> typing.Any:
+        try:
+            try:
+                value = await fetch()
+            except discord.NotFound:
+                value = None
+            self._cache[key] = value
+            return value
+        finally:
+            # on failure nothing is cached, the next lookup tries again
+            del self._inflight[key]
+
+    async def user(self, user_id: int) -> typing.Optional[discord.User]:
+        """The user with this id, ``None`` if there is no such user."""
+        user = self.client.get_user(user_id)
+        if user is not None:
+            return user
+        return await self._resolve(
+            ("user", user_id), lambda: self.client.fetch_user(user_id)
+        )
+
+    async def member(
+        self, guild: discord.Guild, user_id: int
+    ) -> typing.Optional[discord.Member]:
+        """The member of ``guild`` with this id, ``None`` if they aren't in it."""
+        member = guild.get_member(user_id)
+        if member is not None:
+            return member
+        return await self._resolve(
+            ("member", guild.id, user_id), lambda: guild.fetch_member(user_id)
+        )
+
+    def forget(self, user_id: int, guild_id: typing.Optional[int] = None) -> None:
+        """Drop a cached lookup, e.g. after a member left or changed roles."""
+        self._cache.invalidate(("user", user_id))
+        if guild_id is not None:
+            self._cache.invalidate(("member", guild_id, user_id))
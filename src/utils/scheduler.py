@@ -0,0 +1,88 @@
+import asyncio
+import heapq
+import logging
+import time
+import typing
+
+log = logging.getLogger("GiveawayBot.Scheduler")
+
+
+class DeadlineScheduler:
+    """
+    Min-heap of ``(ended_at, giveaway_id)`` that sleeps until the next deadline.
+
+    Rescheduling or cancelling a giveaway does not touch the heap, the stale
+    entry is skipped when it reaches the top instead (lazy deletion).
+    """
+
+    def __init__(
+        self, callback: typing.Callable[[int], typing.Awaitable[None]]
+    ) -> None:
+        self.callback = callback
+        self._heap: typing.List[typing.Tuple[float, int]] = []
+        self._deadlines: typing.Dict[int, float] = {}
+        self._wakeup = asyncio.Event()
+        self._task: typing.Optional[asyncio.Task] = None
+
+    def __len__(self) -> int:
+        return len(self._deadlines)
+
+    def __contains__(self, giveaway_id: int) -> bool:
+        return giveaway_id in self._deadlines
+
+    def schedule(self, giveaway_id: int, ended_at: float) -> None:
+        """Schedule (or reschedule) a giveaway to end at ``ended_at``."""
+        giveaway_id = int(giveaway_id)
+        self._deadlines[giveaway_id] = ended_at
+        heapq.heappush(self._heap, (ended_at, giveaway_id))
+        if self._heap[0] == (ended_at, giveaway_id):
+            # new earliest deadline, the runner has to shorten its sleep
+            self._wakeup.set()
+
+    def cancel(self, giveaway_id: int) -> None:
+        """Forget about a giveaway, if it is scheduled."""
+        self._deadlines.pop(int(giveaway_id), None)
+
+    def next_deadline(self) -> typing.Optional[float]:
+        self._prune()
+        return self._heap[0][0] if self._heap else None
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def _prune(self) -> None:
+        while self._heap:
+            ended_at, giveaway_id = self._heap[0]
+            if self._deadlines.get(giveaway_id) == ended_at:
+                return
+            heapq.heappop(self._heap)
+
+    async def _sleep(self, timeout: typing.Optional[float]) -> None:
+        self._wakeup.clear()
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    async def _run(self) -> None:
+        while True:
+            deadline = self.next_deadline()
+            if deadline is None:
+                await self._sleep(None)
+                continue
+            delay = deadline - time.time()
+            if delay > 0:
+                await self._sleep(delay)
+                continue
+            _, giveaway_id = heapq.heappop(self._heap)
+            del self._deadlines[giveaway_id]
+            try:
+                await self.callback(giveaway_id)
+            except Exception:
+                log.exception(f"Failed to end giveaway {giveaway_id}")
@@ -3,19 +3,39 @@ Stole from [Robo Danny](https://github.com/Rapptz/RoboDanny)
 """
 
 import datetime
+import functools
 import re
 
-import parsedatetime as pdt
-from dateutil.relativedelta import relativedelta
 from discord.ext import commands
 
 from .formats import format_dt as format_dt
 from .formats import human_join, plural
 
-# Monkey patch mins and secs into the units
-units = pdt.pdtLocales["en_US"].units
-units["minutes"].append("mins")
-units["seconds"].append("secs")
+# parsedatetime and dateutil are slow to import and only needed once a
+# time is actually parsed or formatted, so they are imported on first use
+
+
+@functools.lru_cache(maxsize=None)
+def _pdt():
+    import parsedatetime as pdt
+
+    # Monkey patch mins and secs into the units
+    units = pdt.pdtLocales["en_US"].units
+    units["minutes"].append("mins")
+    units["seconds"].append("secs")
+    return pdt
+
+
+@functools.lru_cache(maxsize=None)
+def _calendar():
+    pdt = _pdt()
+    return pdt.Calendar(version=pdt.VERSION_CONTEXT_STYLE)
+
+
+def relativedelta(*args, **kwargs):
+    from dateutil.relativedelta import relativedelta
+
+    return relativedelta(*args, **kwargs)
 
 
 class ShortTime:
@@ -46,11 +66,9 @@ class ShortTime:
 
 
 class HumanTime:
-    calendar = pdt.Calendar(version=pdt.VERSION_CONTEXT_STYLE)
-
     def __init__(self, argument, *, now=None):
         now = now or datetime.datetime.utcnow()
-        dt, status = self.calendar.parseDT(argument, sourceTime=now)
+        dt, status = _calendar().parseDT(argument, sourceTime=now)
         if not status.hasDateOrTime:
             raise commands.BadArgument(
                 'invalid time provided, try e.g. "tomorrow" or "3 days"'
@@ -132,7 +150,7 @@ class UserFriendlyTime(commands.Converter):
         # events modifying the same instance of a converter
         result = self.copy()
         try:
-            calendar = HumanTime.calendar
+            calendar = _calendar()
             regex = ShortTime.compiled
             now = ctx.message.created_at
 
@@ -189,7 +207,7 @@ class UserFriendlyTime(commands.Converter):
                 )
 
             # if midnight is provided, just default to next day
-            if status.accuracy == pdt.pdtContext.ACU_HALFDAY:
+            if status.accuracy == _pdt().pdtContext.ACU_HALFDAY:
                 dt = dt.replace(day=now.day + 1)
 
             result.dt = dt.replace(tzinfo=datetime.timezone.utc)
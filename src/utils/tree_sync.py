@@ -0,0 +1,86 @@
+import datetime
+import hashlib
+import json
+import logging
+import typing
+
+import discord
+from discord import app_commands
+
+log = logging.getLogger("GiveawayBot.TreeSync")
+
+
+def payload(
+    tree: app_commands.CommandTree, guild: typing.Optional[discord.abc.Snowflake] = None
+) -> typing.List[typing.Dict[str, typing.Any]]:
+    """What a sync would upload for ``guild`` (or the global commands)."""
+    commands = [command.to_dict(tree) for command in tree.get_commands(guild=guild)]
+    return sorted(commands, key=lambda command: (command["type"], command["name"]))
+
+
+def tree_hash(
+    tree: app_commands.CommandTree, guild: typing.Optional[discord.abc.Snowflake] = None
+) -> str:
+    serialized = json.dumps(payload(tree, guild), sort_keys=True, default=str)
+    return hashlib.sha256(serialized.encode()).hexdigest()
+
+
+def scopes(client: discord.Client) -> typing.List[typing.Optional[discord.Guild]]:
+    """The global scope and every guild with commands of its own."""
+    return [None] + [
+        guild for guild in client.guilds if client.tree.get_commands(guild=guild)
+    ]
+
+
+async def sync(
+    client: discord.Client,
+    db,
+    guild: typing.Optional[discord.abc.Snowflake] = None,
+    *,
+    force: bool = False,
+) -> bool:
+    """Sync a scope if its commands changed since the last sync.
+
+    The hash of what was last uploaded is kept in the database, so restarts
+    and reconnects don't sync again. Returns whether a sync happened.
+    """
+    scope = guild.id if guild is not None else 0
+    digest = tree_hash(client.tree, guild)
+    if not force and await db.fetchval("command_hash", scope) == digest:
+        return False
+    await client.tree.sync(guild=guild)
+    await db.execute(
+        "upsert_command_hash", scope, digest, datetime.datetime.now().timestamp()
+    )
+    log.info(f"Synced application commands of scope {scope}")
+    return True
+
+
+def _signature(command: typing.Mapping) -> typing.Any:
+    return (
+        command.get("description", ""),
+        [
+            (option["name"], option["type"], option.get("required", False))
+            for option in command.get("options", ())
+        ],
+    )
+
+
+async def diff(
+    client: discord.Client, guild: typing.Optional[discord.abc.Snowflake] = None
+) -> typing.Dict[str, typing.List[str]]:
+    """Compare the local commands of a scope with what Discord has."""
+    local = {command["name"]: command for command in payload(client.tree, guild)}
+    remote = {
+        command.name: command.to_dict()
+        for command in await client.tree.fetch_commands(guild=guild)
+    }
+    return {
+        "added": sorted(local.keys() - remote.keys()),
+        "removed": sorted(remote.keys() - local.keys()),
+        "changed": sorted(
+            name
+            for name in local.keys() & remote.keys()
+            if _signature(local[name]) != _signature(remote[name])
+        ),
+    }
@@ -0,0 +1,93 @@
+import asyncio
+import logging
+import typing
+
+log = logging.getLogger("GiveawayBot.Workers")
+
+
+class FinalizationPool:
+    """
+    Runs giveaway finalizations concurrently.
+
+    At most ``concurrency`` run at once, giveaways in the same channel run
+    one after another, and a failed finalization is retried with a growing
+    delay without holding up the rest of the batch.
+    """
+
+    def __init__(
+        self,
+        handler: typing.Callable[[typing.Mapping], typing.Awaitable[None]],
+        *,
+        concurrency: int = 8,
+        retries: int = 3,
+        backoff: float = 2.0,
+        no_retry: typing.Tuple[typing.Type[BaseException], ...] = (),
+    ) -> None:
+        self.handler = handler
+        self.retries = retries
+        self.backoff = backoff
+        self.no_retry = no_retry
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._channel_locks: typing.Dict[int, asyncio.Lock] = {}
+        self._channel_users: typing.Dict[int, int] = {}
+        self._tasks: typing.Dict[int, asyncio.Task] = {}
+
+    def __len__(self) -> int:
+        return len(self._tasks)
+
+    def __contains__(self, giveaway_id: int) -> bool:
+        return giveaway_id in self._tasks
+
+    def submit(self, giveaway: typing.Mapping) -> asyncio.Task:
+        """Queue a giveaway, submitting one that is already queued is a no-op."""
+        task = self._tasks.get(giveaway["id"])
+        if task is None:
+            task = asyncio.create_task(self._run(giveaway))
+            self._tasks[giveaway["id"]] = task
+            task.add_done_callback(lambda _: self._tasks.pop(giveaway["id"], None))
+        return task
+
+    async def join(self) -> None:
+        """Wait until everything submitted so far is done."""
+        while self._tasks:
+            await asyncio.gather(*self._tasks.values(), return_exceptions=True)
+
+    def cancel(self) -> None:
+        for task in self._tasks.values():
+            task.cancel()
+
+    async def _attempt(self, giveaway: typing.Mapping) -> None:
+        channel_id = giveaway["channel_id"]
+        lock = self._channel_locks.setdefault(channel_id, asyncio.Lock())
+        self._channel_users[channel_id] = self._channel_users.get(channel_id, 0) + 1
+        try:
+            # take the channel turn first so waiting doesn't hold a slot
+            async with lock:
+                async with self._semaphore:
+                    await self.handler(giveaway)
+        finally:
+            self._channel_users[channel_id] -= 1
+            if not self._channel_users[channel_id]:
+                del self._channel_users[channel_id]
+                del self._channel_locks[channel_id]
+
+    async def _run(self, giveaway: typing.Mapping) -> None:
+        for attempt in range(1, self.retries + 2):
+            try:
+                await self._attempt(giveaway)
+                return
+            except asyncio.CancelledError:
+                raise
+            except self.no_retry:
+                log.exception(f"Giving up on giveaway {giveaway['id']}")
+                return
+            except Exception:
+                if attempt > self.retries:
+                    log.exception(
+                        f"Giving up on giveaway {giveaway['id']} after {attempt} attempts"
+                    )
+                    return
+                log.exception(
+                    f"Failed to finalize giveaway {giveaway['id']}, retrying (attempt {attempt})"
+                )
+                await asyncio.sleep(self.backoff * attempt)